@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from reviews.models import ADMIN, MODERATOR, User
+
+TOKEN_USER_CLAIMS = ('role', 'is_staff', 'username')
+USER_NOT_FOUND_ERROR = 'Пользователь не найден.'
+
+
+class UserCache:
+    """LRU-кеш пользователей процесса с ограниченным временем жизни.
+
+    Время последнего изменения или удаления пользователя хранится в общем
+    для процессов кеше USER_CACHE_INVALIDATION_CACHE: пользователи,
+    загруженные раньше, перечитываются из базы, а токены, выпущенные
+    раньше, перестают быть достаточными для авторизации без базы данных.
+    """
+
+    def __init__(self, max_size, timeout, token_lifetime):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.token_lifetime = token_lifetime
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def changes(self):
+        return caches[settings.USER_CACHE_INVALIDATION_CACHE]
+
+    @staticmethod
+    def get_changed_key(user_id):
+        return f'user-changed:{user_id}'
+
+    def get_changed_at(self, user_id):
+        return self.changes.get(self.get_changed_key(user_id))
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._users.get(user_id)
+        if cached and cached[0] > now:
+            changed_at = self.get_changed_at(user_id)
+            if changed_at is None or changed_at < cached[1]:
+                with self._lock:
+                    if user_id in self._users:
+                        self._users.move_to_end(user_id)
+                return cached[2]
+        # Время загрузки берётся до запроса: изменение, сделанное во время
+        # запроса, заставит перечитать пользователя.
+        loaded_at = time.time()
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        with self._lock:
+            self._users[user_id] = (now + self.timeout, loaded_at, user)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+        # Токены, выпущенные раньше token_lifetime, уже истекли.
+        self.changes.set(
+            self.get_changed_key(user_id), time.time(), self.token_lifetime
+        )
+
+    def changed_since(self, user_id, issued_at):
+        changed_at = self.get_changed_at(user_id)
+        return changed_at is not None and int(changed_at) >= issued_at
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache(
+    settings.USER_CACHE_SIZE,
+    settings.USER_CACHE_TIMEOUT,
+    api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+)
+
+
+def invalidate_cached_user(sender, instance, using, created=False, **kwargs):
+    """Обработчик post_save и post_delete модели User.
+
+    Срабатывает при любом сохранении через модель (API, админка,
+    shell); изменения через QuerySet.update() сигналов не вызывают,
+    и их действие ограничено временем жизни токена. Отметка ставится
+    после фиксации транзакции, чтобы другой процесс не закешировал
+    ещё не изменённого пользователя.
+    """
+    if created:
+        return
+    user_id = instance.pk
+    transaction.on_commit(lambda: user_cache.invalidate(user_id), using)
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, собранный из утверждений токена, без запроса к базе."""
+
+    @property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_admin(self):
+        return self.role == ADMIN.role or self.is_staff
+
+    @property
+    def is_moderator(self):
+        return self.role == MODERATOR.role
+
+
+def get_access_token(user):
+    token = RefreshToken.for_user(user).access_token
+    for claim in TOKEN_USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def get_full_user(user):
+    """Модель User для авторизованного пользователя запроса."""
+    if isinstance(user, User):
+        return user
+    full_user = user_cache.get(user.id)
+    if full_user is None:
+        raise AuthenticationFailed(USER_NOT_FOUND_ERROR)
+    return full_user
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без чтения пользователя на каждый запрос.
+
+    Если в токене есть роль и он выпущен после последнего изменения
+    пользователя, права проверяются по ClaimsUser. Иначе пользователь
+    берётся из user_cache, а при промахе - из базы данных. Блокировка
+    (is_active=False) и удаление - тоже изменения пользователя, поэтому
+    такие токены проверяются по базе и отклоняются.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or any(
+            claim not in validated_token for claim in TOKEN_USER_CLAIMS
+        ) or user_cache.changed_since(user_id, validated_token['iat']):
+            user = user_cache.get(user_id)
+            if user is None or not user.is_active:
+                raise AuthenticationFailed(USER_NOT_FOUND_ERROR)
+            return user
+        return ClaimsUser(validated_token)
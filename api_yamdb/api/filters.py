@@ -1,12 +1,79 @@
-from django_filters import CharFilter, FilterSet
+from django.db.models import Exists, OuterRef
+from django_filters import (
+    CharFilter, ChoiceFilter, FilterSet, IsoDateTimeFilter
+)
+from rest_framework.exceptions import ValidationError
 
+from api.pagination import KeysetPagination
 from reviews.models import Title
+from reviews.search import search_titles
+
+GENRE_MODE_ANY = 'any'
+GENRE_MODE_ALL = 'all'
+GENRE_MODE_CHOICES = (
+    (GENRE_MODE_ANY, 'Любой из жанров'),
+    (GENRE_MODE_ALL, 'Все жанры'),
+)
+SEARCH_WITH_CURSOR_ERROR = (
+    'Результаты поиска упорядочены по релевантности и не поддерживают '
+    'пагинацию курсором.'
+)
+
+
+def split_slugs(value):
+    return [slug for slug in value.split(',') if slug]
 
 
 class TitleFilter(FilterSet):
-    category = CharFilter(field_name='category__slug')
-    genre = CharFilter(field_name='genre__slug')
+    """Фильтр произведений.
+
+    category и genre принимают несколько слагов через запятую; genre_mode
+    задаёт, должны ли у произведения быть все перечисленные жанры или
+    хотя бы один. Жанры проверяются подзапросами EXISTS, поэтому строки
+    произведений не дублируются. search нельзя сочетать с cursor:
+    курсор упорядочивает страницы по полям произведения, а не по рангу.
+    """
+
+    category = CharFilter(method='filter_category')
+    genre = CharFilter(method='filter_genre')
+    genre_mode = ChoiceFilter(
+        choices=GENRE_MODE_CHOICES, method='filter_genre_mode'
+    )
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ('name', 'year', 'description', 'category', 'genre')
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category__slug__in=split_slugs(value))
+
+    def filter_genre(self, queryset, name, value):
+        title_genres = Title.genre.through.objects.filter(
+            title_id=OuterRef('pk')
+        )
+        slugs = split_slugs(value)
+        if self.form.cleaned_data.get('genre_mode') != GENRE_MODE_ALL:
+            return queryset.filter(
+                Exists(title_genres.filter(genre__slug__in=slugs))
+            )
+        for slug in dict.fromkeys(slugs):
+            queryset = queryset.filter(
+                Exists(title_genres.filter(genre__slug=slug))
+            )
+        return queryset
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Режим учитывается в filter_genre.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        if KeysetPagination.cursor_query_param in self.request.query_params:
+            raise ValidationError({name: [SEARCH_WITH_CURSOR_ERROR]})
+        return search_titles(queryset, value)
+
+
+class PublicationFilter(FilterSet):
+    """Отзывы и комментарии, опубликованные позже переданного момента."""
+
+    since = IsoDateTimeFilter(field_name='pub_date', lookup_expr='gt')
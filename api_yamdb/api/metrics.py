@@ -0,0 +1,418 @@
+"""Метрики запросов в формате Prometheus.
+
+MetricsMiddleware для каждого маршрута (url_name), метода и статуса
+ответа считает запросы, гистограмму длительности, запросы к БД и их
+суммарное время (обёртка из connection.execute_wrappers) и размер
+ответов.
+Каждый поток пишет только в свои счётчики, поэтому запросы не ждут
+блокировок; представление metrics складывает счётчики всех потоков
+процесса, а счётчики завершённых потоков переносятся в общий итог.
+
+Если задан METRICS_DIR, процесс не чаще раза в METRICS_FLUSH_INTERVAL
+секунд сохраняет свои счётчики в файл каталога, а metrics суммирует
+файлы всех процессов (например, воркеров gunicorn). Счётчики в
+Prometheus только растут, поэтому файлы завершённых процессов
+переносятся в общий архив каталога. Перед запуском сервера каталог
+очищает команда clear_metrics.
+
+Метрики отдаются только с заголовком Authorization: Bearer METRICS_TOKEN;
+без METRICS_TOKEN адрес /metrics отвечает 404.
+"""
+import fcntl
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LABELS = ('route', 'method', 'status')
+UNRESOLVED_ROUTE = 'unresolved'
+# Прочие методы объединяются в одну метку, иначе клиент мог бы создавать
+# новые ряды метрик произвольными методами.
+HTTP_METHODS = frozenset((
+    'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE',
+    'CONNECT'
+))
+OTHER_METHOD = 'other'
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+# Имя, описание и индекс значения в RouteStats.values.
+COUNTERS = (
+    ('yamdb_http_requests_total', 'Количество запросов.', 0),
+    ('yamdb_http_db_queries_total', 'Количество запросов к БД.', 2),
+    ('yamdb_http_db_duration_seconds_total',
+     'Суммарное время запросов к БД.', 3),
+    ('yamdb_http_response_size_bytes_total',
+     'Суммарный размер ответов.', 4),
+)
+HISTOGRAM = 'yamdb_http_request_duration_seconds'
+ARCHIVE_NAME = 'archive.json'
+ARCHIVE_LOCK_NAME = 'archive.lock'
+
+
+class RouteStats:
+    """Счётчики одного маршрута в одном потоке.
+
+    values - [запросы, сумма длительностей, запросы к БД, время БД,
+    байты ответа], buckets - количество запросов в каждом интервале
+    LATENCY_BUCKETS (последний - больше всех границ).
+    """
+
+    __slots__ = ('values', 'buckets')
+
+    def __init__(self, values=None, buckets=None):
+        self.values = values or [0, 0.0, 0, 0.0, 0]
+        self.buckets = buckets or [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, duration, queries, db_duration, size):
+        values = self.values
+        values[0] += 1
+        values[1] += duration
+        values[2] += queries
+        values[3] += db_duration
+        values[4] += size
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                break
+        else:
+            index = len(LATENCY_BUCKETS)
+        self.buckets[index] += 1
+
+    def add(self, other):
+        self.values = [a + b for a, b in zip(self.values, other.values)]
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+
+class ThreadStats(threading.local):
+    """Счётчики текущего потока; все они перечислены в registry."""
+
+    def __init__(self, registry):
+        self.routes = {}
+        registry.register(self.routes)
+
+
+def add_routes(total, routes):
+    for key, stats in list(routes.items()):
+        total.setdefault(key, RouteStats()).add(stats)
+    return total
+
+
+def read_routes(path):
+    with open(path) as file:
+        return {
+            tuple(key): RouteStats(values, buckets)
+            for key, values, buckets in json.load(file)
+        }
+
+
+def write_routes(path, routes):
+    # У каждого потока свой временный файл, замена файла атомарна.
+    temp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump([
+            [list(key), stats.values, stats.buckets]
+            for key, stats in routes.items()
+        ], file)
+    os.replace(temp_path, path)
+
+
+def get_file_pid(name):
+    """PID процесса из имени файла счётчиков или None."""
+    pid, separator, _ = name.partition('-')
+    if not (separator and name.endswith('.json') and pid.isdigit()):
+        return None
+    return int(pid)
+
+
+def is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsRegistry:
+    """Накопители процесса и их сохранение в METRICS_DIR."""
+
+    def __init__(self):
+        # Потоки и их счётчики; блокировка нужна только при появлении
+        # потока и при чтении метрик.
+        self._threads = []
+        self._finished = {}
+        self._lock = threading.Lock()
+        self._local = ThreadStats(self)
+        self._flushed = time.monotonic()
+        self._file_owner = None
+
+    def register(self, routes):
+        with self._lock:
+            self._collect_finished()
+            self._threads.append((threading.current_thread(), routes))
+
+    def _collect_finished(self):
+        """Переносит счётчики завершённых потоков в общий итог."""
+        alive = []
+        for thread, routes in self._threads:
+            if thread.is_alive():
+                alive.append((thread, routes))
+            else:
+                add_routes(self._finished, routes)
+        self._threads = alive
+
+    def get_stats(self, key):
+        routes = self._local.routes
+        stats = routes.get(key)
+        if stats is None:
+            stats = routes[key] = RouteStats()
+        return stats
+
+    def snapshot(self):
+        """Сумма счётчиков всех потоков процесса."""
+        with self._lock:
+            self._collect_finished()
+            total = add_routes({}, self._finished)
+            for _, routes in self._threads:
+                add_routes(total, routes)
+        return total
+
+    def clear(self):
+        with self._lock:
+            self._finished.clear()
+            for _, routes in self._threads:
+                routes.clear()
+
+    def get_path(self):
+        # Метка в имени отличает процесс от завершённого процесса с тем
+        # же PID; дочерний процесс после fork получает новую метку.
+        pid = os.getpid()
+        if self._file_owner is None or self._file_owner[0] != pid:
+            self._file_owner = (pid, uuid.uuid4().hex)
+        return os.path.join(
+            settings.METRICS_DIR,
+            f'{self._file_owner[0]}-{self._file_owner[1]}.json'
+        )
+
+    def flush(self, force=False):
+        """Сохраняет счётчики процесса, если пора или force."""
+        if not settings.METRICS_DIR:
+            return
+        now = time.monotonic()
+        if not force and (
+            now - self._flushed < settings.METRICS_FLUSH_INTERVAL
+        ):
+            return
+        self._flushed = now
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        write_routes(self.get_path(), self.snapshot())
+
+    def collect(self):
+        """Счётчики процесса или, при METRICS_DIR, всех процессов."""
+        if not settings.METRICS_DIR:
+            return self.snapshot()
+        self.flush(force=True)
+        directory = settings.METRICS_DIR
+        archive_path = os.path.join(directory, ARCHIVE_NAME)
+        # Архив меняется под блокировкой, чтобы файл завершённого
+        # процесса не был учтён дважды.
+        with open(os.path.join(directory, ARCHIVE_LOCK_NAME), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive = read_routes(archive_path) if os.path.exists(
+                archive_path
+            ) else {}
+            total = add_routes({}, archive)
+            finished = []
+            for name in os.listdir(directory):
+                pid = get_file_pid(name)
+                if pid is None:
+                    continue
+                try:
+                    routes = read_routes(os.path.join(directory, name))
+                except (OSError, ValueError):
+                    continue
+                add_routes(total, routes)
+                if not is_process_alive(pid):
+                    add_routes(archive, routes)
+                    finished.append(name)
+            if finished:
+                write_routes(archive_path, archive)
+                for name in finished:
+                    os.remove(os.path.join(directory, name))
+        return total
+
+
+def clear_metrics_directory():
+    """Удаляет сохранённые счётчики всех процессов из METRICS_DIR."""
+    if not settings.METRICS_DIR or not os.path.isdir(settings.METRICS_DIR):
+        return 0
+    removed = 0
+    for name in os.listdir(settings.METRICS_DIR):
+        if get_file_pid(name) is not None or name == ARCHIVE_NAME:
+            os.remove(os.path.join(settings.METRICS_DIR, name))
+            removed += 1
+    return removed
+
+
+registry = MetricsRegistry()
+
+
+class QueryTimer:
+    """Количество и суммарное время запросов к БД.
+
+    При record=True в log сохраняются и сами запросы.
+    """
+
+    def __init__(self, record=False):
+        self.queries = 0
+        self.duration = 0.0
+        self.log = [] if record else None
+
+    def add(self, alias, sql, params, many, duration):
+        self.queries += 1
+        self.duration += duration
+        if self.log is not None:
+            self.log.append(dict(
+                alias=alias, sql=sql, params=params, many=many,
+                duration=duration
+            ))
+
+
+_query_timers = ContextVar('query_timers', default=())
+
+
+@contextmanager
+def track_queries(record=False):
+    """Считает запросы к БД внутри блока; блоки могут быть вложенными."""
+    timer = QueryTimer(record)
+    token = _query_timers.set((*_query_timers.get(), timer))
+    try:
+        yield timer
+    finally:
+        _query_timers.reset(token)
+
+
+def time_query(execute, sql, params, many, context):
+    timers = _query_timers.get()
+    if not timers:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        for timer in timers:
+            timer.add(
+                context['connection'].alias, sql, params, many, duration
+            )
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """Обработчик connection_created: обёртка ставится один раз.
+
+    Обёртка остаётся на объекте подключения и при переподключении,
+    поэтому middleware не перебирает подключения на каждый запрос.
+    """
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_query)
+
+
+def get_response_size(response):
+    if response.streaming:
+        return int(response.get('Content-Length', 0))
+    return len(response.content)
+
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with track_queries() as timer:
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        registry.get_stats((
+            (match.url_name or match.view_name) if match
+            else UNRESOLVED_ROUTE,
+            request.method if request.method in HTTP_METHODS
+            else OTHER_METHOD,
+            str(response.status_code)
+        )).observe(
+            duration, timer.queries, timer.duration,
+            get_response_size(response)
+        )
+        registry.flush()
+        return response
+
+
+def escape_label(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n'
+    )
+
+
+def format_labels(key, **extra):
+    pairs = (*zip(LABELS, key), *extra.items())
+    return ','.join(
+        f'{name}="{escape_label(str(value))}"' for name, value in pairs
+    )
+
+
+def render_metrics(stats):
+    """Текст метрик в формате Prometheus."""
+    rows = sorted(stats.items())
+    lines = []
+    for name, help_text, index in COUNTERS:
+        lines += (f'# HELP {name} {help_text}', f'# TYPE {name} counter')
+        lines += (
+            f'{name}{{{format_labels(key)}}} {route.values[index]}'
+            for key, route in rows
+        )
+    lines += (
+        f'# HELP {HISTOGRAM} Длительность обработки запроса.',
+        f'# TYPE {HISTOGRAM} histogram',
+    )
+    for key, route in rows:
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, '+Inf'), route.buckets):
+            cumulative += count
+            lines.append(
+                f'{HISTOGRAM}_bucket{{{format_labels(key, le=bound)}}} '
+                f'{cumulative}'
+            )
+        lines += (
+            f'{HISTOGRAM}_sum{{{format_labels(key)}}} {route.values[1]}',
+            f'{HISTOGRAM}_count{{{format_labels(key)}}} {route.values[0]}',
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def is_metrics_request_authorized(request):
+    expected = f'Bearer {settings.METRICS_TOKEN}'.encode()
+    return hmac.compare_digest(
+        request.headers.get('Authorization', '').encode(), expected
+    )
+
+
+def metrics(request):
+    if not settings.METRICS_TOKEN:
+        raise Http404
+    if not is_metrics_request_authorized(request):
+        response = HttpResponse(status=401)
+        response['WWW-Authenticate'] = 'Bearer'
+        return response
+    return HttpResponse(
+        render_metrics(registry.collect()), content_type=CONTENT_TYPE
+    )
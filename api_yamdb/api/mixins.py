@@ -1,6 +1,221 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from api.replicas import (
+    choose_read_alias, mark_sticky, reset_read_alias, use_read_alias
+)
 from reviews.validators import validate_username
 
 
 class UserNameValidationMixin:
     def validate_username(self, username):
         return validate_username(username)
+
+
+class SparseFieldsMixin:
+    """Ограничиваем поля ответа параметрами ?fields= и ?omit=.
+
+    Оба параметра принимают имена полей через запятую и действуют
+    только на запросы на чтение.
+    """
+
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        kept_fields = self.get_sparse_fields(self.context.get('request'))
+        if kept_fields is None:
+            return
+        for name in set(self.fields) - kept_fields:
+            self.fields.pop(name)
+
+    @classmethod
+    def get_sparse_fields(cls, request):
+        """Имена полей, которые останутся в ответе, или None."""
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        params = request.query_params
+        if (
+            cls.fields_query_param not in params
+            and cls.omit_query_param not in params
+        ):
+            return None
+        kept_fields = set(cls.Meta.fields)
+        if cls.fields_query_param in params:
+            kept_fields &= set(
+                params[cls.fields_query_param].split(',')
+            )
+        return kept_fields - set(
+            params.get(cls.omit_query_param, '').split(',')
+        )
+
+
+class SparseFieldsQuerysetMixin:
+    """Загружаем из БД только то, что нужно полям из ?fields= и ?omit=.
+
+    sparse_field_sources - поля модели, из которых строится поле
+    сериализатора, если имена отличаются; sparse_select_related и
+    sparse_prefetch_related (имена или Prefetch) - поля-связи, которые
+    подгружаются, только если остались в ответе. Для поля из
+    sparse_prefetch_related загружаются колонки из sparse_field_sources,
+    если они заданы (например, author_id для внешнего ключа).
+    """
+
+    sparse_field_sources = {}
+    sparse_select_related = ()
+    sparse_prefetch_related = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if not hasattr(serializer_class, 'get_sparse_fields'):
+            return queryset
+        kept_fields = serializer_class.get_sparse_fields(self.request)
+        if kept_fields is None:
+            return queryset
+        only = {'pk'} | {
+            field.lstrip('-')
+            for field in getattr(self.paginator, 'ordering', None) or ()
+        }
+        prefetch_lookups = {
+            getattr(lookup, 'prefetch_to', lookup): lookup
+            for lookup in self.sparse_prefetch_related
+        }
+        for name in kept_fields:
+            if name in prefetch_lookups and (
+                name not in self.sparse_field_sources
+            ):
+                continue
+            only.update(self.sparse_field_sources.get(name, (name,)))
+        select_related = kept_fields & set(self.sparse_select_related)
+        queryset = queryset.select_related(None).prefetch_related(
+            None
+        ).prefetch_related(*(
+            lookup for name, lookup in prefetch_lookups.items()
+            if name in kept_fields
+        ))
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        return queryset.only(*only)
+
+
+class NestedParentMixin:
+    """Родитель вложенного маршрута, загруженный один раз за запрос.
+
+    parent_lookups - пары (параметр URL, поле parent_model): вся цепочка
+    родителей проверяется одним запросом, и если объект из URL относится
+    к другому родителю, возвращается 404.
+    """
+
+    parent_model = None
+    parent_lookups = ()
+    parent_select_related = ()
+
+    def get_parent_queryset(self):
+        return self.parent_model.objects.select_related(
+            *self.parent_select_related
+        )
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.get_parent_queryset(),
+                **{
+                    field: self.kwargs[kwarg]
+                    for kwarg, field in self.parent_lookups
+                }
+            )
+        return self._parent
+
+
+class AuthorConditionalWriteMixin:
+    """Правка и удаление публикации автором без предварительной загрузки.
+
+    Для пользователей без прав модератора UPDATE и DELETE выполняются
+    одним запросом с условием author_id; если не затронута ни одна строка,
+    по наличию объекта различаем 403 и 404. Используется вместе с
+    NestedParentMixin: parent_field - поле связи с ближайшим родителем;
+    запросы направляются в шард произведения из параметра title_id.
+    """
+
+    parent_field = None
+
+    def is_privileged_writer(self):
+        return self.request.user.is_admin or self.request.user.is_moderator
+
+    def get_write_queryset(self):
+        model = self.get_serializer_class().Meta.model
+        return model.objects.for_title(self.kwargs['title_id']).filter(
+            pk=self.kwargs['pk'],
+            **{
+                f'{self.parent_field}__{field}': self.kwargs[kwarg]
+                for kwarg, field in self.parent_lookups
+            }
+        )
+
+    def perform_conditional_update(self, queryset, data):
+        return queryset.update(**data)
+
+    def raise_for_missing_write(self, queryset):
+        if queryset.exists():
+            raise PermissionDenied()
+        raise NotFound()
+
+    def update(self, request, *args, **kwargs):
+        if self.is_privileged_writer():
+            return super().update(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        queryset = self.get_write_queryset()
+        own_queryset = queryset.filter(author_id=request.user.id)
+        # Пустое изменение (например, только поля для чтения) не меняет
+        # строк: проверяем лишь, что публикация принадлежит автору.
+        updated = self.perform_conditional_update(
+            own_queryset, serializer.validated_data
+        ) if serializer.validated_data else own_queryset.exists()
+        if not updated:
+            self.raise_for_missing_write(queryset)
+        return Response(
+            self.get_serializer(queryset.with_authors().get()).data
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        if self.is_privileged_writer():
+            return super().destroy(request, *args, **kwargs)
+        queryset = self.get_write_queryset()
+        deleted, _ = queryset.filter(author_id=request.user.id).delete()
+        if not deleted:
+            self.raise_for_missing_write(queryset)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ReplicaReadMixin:
+    """Безопасные запросы читают с реплики, запись закрепляет клиента.
+
+    После небезопасного запроса ответ помечается (api.replicas.mark_sticky),
+    и следующие REPLICA_STICKY_SECONDS секунд клиент читает из основной
+    базы.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = use_read_alias(
+            choose_read_alias(request)
+            if request.method in SAFE_METHODS
+            else None
+        )
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            reset_read_alias(token)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if request.method not in SAFE_METHODS:
+            mark_sticky(response)
+        return response
@@ -0,0 +1,228 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.utils import get_request_signature
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, который хранит общее количество объектов в кеше."""
+
+    def __init__(self, object_list, per_page, cache_key=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self):
+        timeout = settings.PAGINATION_COUNT_CACHE_TIMEOUT
+        if not timeout or self.cache_key is None:
+            return super().count
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = super().count
+            cache.set(self.cache_key, count, timeout)
+        return count
+
+
+class OptionalCountPagination(PageNumberPagination):
+    """Постраничная пагинация, в которой подсчёт количества можно отключить.
+
+    С параметром count=false вместо COUNT(*) выбирается на одну запись
+    больше размера страницы, а ключ count в ответе равен null. Иначе
+    количество объектов при PAGINATION_COUNT_CACHE_TIMEOUT > 0 кешируется
+    для каждого набора параметров запроса.
+    """
+
+    count_query_param = 'count'
+    count_disabled_values = ('false', '0')
+    # Параметры, которые не влияют на общее количество объектов.
+    count_cache_ignored_params = ('page', 'cursor', 'count')
+
+    def django_paginator_class(self, object_list, per_page):
+        return CachedCountPaginator(
+            object_list, per_page, cache_key=self.get_count_cache_key()
+        )
+
+    def get_count_cache_key(self):
+        return 'pagination-count:' + get_request_signature(
+            self.request, self.count_cache_ignored_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.with_count = request.query_params.get(
+            self.count_query_param, ''
+        ).lower() not in self.count_disabled_values
+        if self.with_count:
+            return super().paginate_queryset(queryset, request, view)
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(
+                request.query_params.get(self.page_query_param, 1)
+            )
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message)
+        offset = (self.page_number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        if not results and self.page_number != 1:
+            raise NotFound(self.invalid_page_message)
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
+    def get_next_link(self):
+        if self.with_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param,
+            self.page_number + 1
+        )
+
+    def get_previous_link(self):
+        if self.with_count:
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict((
+            ('count', self.page.paginator.count if self.with_count else None),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        )))
+
+
+class KeysetPagination(OptionalCountPagination):
+    """Постраничная пагинация с опциональным режимом курсора.
+
+    Если в запросе передан параметр cursor (в том числе пустой), страница
+    выбирается по значениям полей ordering последней записи предыдущей
+    страницы: без OFFSET и без подсчёта общего количества объектов.
+    Последнее поле ordering должно быть уникальным.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+    ordering = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        try:
+            if position is not None:
+                queryset = queryset.filter(self.get_seek_filter(position))
+            # Слишком большие числа курсора база отклоняет при выполнении.
+            results = list(queryset[:page_size + 1])
+        except (TypeError, ValueError, OverflowError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+        return self.page
+
+    def get_seek_filter(self, position):
+        """Условие «строго после позиции» в порядке ordering.
+
+        Нестрогое условие по первому полю добавлено, чтобы индекс
+        использовался для поиска начала страницы, а не только для сортировки.
+        """
+        first_field, *_ = self.ordering
+        seek = Q(**{
+            self.get_lookup(first_field, strict=False): position[0]
+        })
+        after = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            after |= equal & Q(**{self.get_lookup(field): value})
+            equal &= Q(**{field.lstrip('-'): value})
+        return seek & after
+
+    @staticmethod
+    def get_lookup(field, strict=True):
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        return f'{field.lstrip("-")}__{lookup}{"" if strict else "e"}'
+
+    def get_position(self, obj):
+        if isinstance(obj, dict):
+            return [obj[field.lstrip('-')] for field in self.ordering]
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    def encode_cursor(self, position):
+        data = json.dumps(
+            position,
+            default=lambda value: value.isoformat(),
+            ensure_ascii=False
+        )
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(self.get_position(self.page[-1]))
+        )
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict((
+            ('next', self.get_next_link()),
+            ('results', data)
+        )))
+
+
+class TitlePagination(KeysetPagination):
+    ordering = ('-year', 'name', 'id')
+
+
+class PublicationPagination(KeysetPagination):
+    ordering = ('-pub_date', '-id')
@@ -0,0 +1,160 @@
+"""Заголовки Server-Timing и X-DB-Queries для профилирования ответов.
+
+При SERVER_TIMING ServerTimingMiddleware добавляет к ответам заголовок
+Server-Timing со временем в миллисекундах:
+    db - запросы к БД за весь запрос;
+    serialize - работа представления без запросов к БД (в основном
+    сериализация данных);
+    render - рендеринг ответа (для DRF - в JSON);
+    total - обработка запроса целиком,
+и заголовок X-DB-Queries с количеством запросов к БД. Администратор
+с параметром ?_explain=1 в безопасном запросе (GET, HEAD, OPTIONS)
+вместо ответа получает выполненные запросы и их планы.
+"""
+import json
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from api.metrics import track_queries
+
+EXPLAIN_PARAM = '_explain'
+
+
+class RequestTiming:
+    """Отметки времени одного запроса."""
+
+    def __init__(self, timer):
+        self.timer = timer
+        self.start = time.perf_counter()
+        self.view_start = self.view_db_start = None
+        self.render_start = self.view_db_end = None
+
+    def get_timings(self):
+        end = time.perf_counter()
+        timings = dict(db=self.timer.duration, serialize=0.0, render=0.0)
+        if self.view_start is not None:
+            view_end = self.render_start or end
+            view_db_end = (
+                self.timer.duration if self.view_db_end is None
+                else self.view_db_end
+            )
+            timings['serialize'] = max(0.0, (
+                view_end - self.view_start
+            ) - (view_db_end - self.view_db_start))
+        if self.render_start is not None:
+            timings['render'] = end - self.render_start
+        timings['total'] = end - self.start
+        return timings
+
+
+def format_server_timing(timings):
+    return ', '.join(
+        f'{name};dur={duration * 1000:.1f}'
+        for name, duration in timings.items()
+    )
+
+
+def explain(query):
+    """План запроса SELECT или None для остальных запросов."""
+    if query['many'] or not query['sql'].lstrip().upper().startswith(
+        'SELECT'
+    ):
+        return None
+    connection = connections[query['alias']]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{connection.ops.explain_query_prefix()} {query["sql"]}',
+            query['params']
+        )
+        # Последняя колонка - описание шага плана (SQLite и PostgreSQL).
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def get_response_data(response):
+    if response.streaming or 'json' not in response.get('Content-Type', ''):
+        return None
+    try:
+        return json.loads(response.content)
+    except ValueError:
+        return None
+
+
+def get_request_user(request):
+    """Пользователь запроса по классам аутентификации DRF или None."""
+    drf_request = Request(request)
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(drf_request)
+        except APIException:
+            return None
+        if result is not None:
+            return result[0]
+    return None
+
+
+def is_explain_request(request):
+    """Запрошен ли режим _explain администратором.
+
+    Планы строятся после представления, поэтому небезопасные запросы
+    к этому времени уже изменили бы данные: для них режим недоступен.
+    Пользователь из JWT определяется до представления, чтобы запросы
+    к БД записывались только в режиме _explain.
+    """
+    if request.method not in SAFE_METHODS or (
+        request.GET.get(EXPLAIN_PARAM) != '1'
+    ):
+        return False
+    return getattr(get_request_user(request), 'is_admin', False)
+
+
+class ServerTimingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SERVER_TIMING:
+            return self.get_response(request)
+        explain_mode = is_explain_request(request)
+        with track_queries(record=explain_mode) as timer:
+            request.server_timing = RequestTiming(timer)
+            response = self.get_response(request)
+        timings = request.server_timing.get_timings()
+        if explain_mode:
+            response = JsonResponse(dict(
+                status=response.status_code,
+                response=get_response_data(response),
+                queries=[
+                    dict(
+                        alias=query['alias'],
+                        sql=query['sql'],
+                        params=query['params'],
+                        duration=query['duration'],
+                        plan=explain(query)
+                    )
+                    for query in timer.log
+                ]
+            ))
+        response['Server-Timing'] = format_server_timing(timings)
+        response['X-DB-Queries'] = str(timer.queries)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = getattr(request, 'server_timing', None)
+        if timing is not None:
+            timing.view_start = time.perf_counter()
+            timing.view_db_start = timing.timer.duration
+
+    def process_template_response(self, request, response):
+        timing = getattr(request, 'server_timing', None)
+        if timing is not None:
+            timing.render_start = time.perf_counter()
+            timing.view_db_end = timing.timer.duration
+        return response
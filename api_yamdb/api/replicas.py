@@ -0,0 +1,81 @@
+"""Чтение с реплик для публичных GET-запросов каталога.
+
+ReplicaReadMixin выбирает реплику на время обработки безопасного
+запроса, а ReplicaRouter направляет чтения на неё; запись всегда идёт
+в основную базу. После записи клиент получает cookie (и заголовок)
+с моментом, до которого его чтения остаются на основной базе, чтобы он
+видел свои изменения, пока реплика не догнала основную базу.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_HEADER = 'X-Primary-Until'
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def get_sticky_until(request):
+    value = request.COOKIES.get(
+        settings.REPLICA_STICKY_COOKIE,
+        request.headers.get(STICKY_HEADER)
+    )
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def choose_read_alias(request):
+    """Алиас реплики для запроса или None, если читать из основной базы."""
+    if not settings.REPLICA_READS or get_sticky_until(request) > (
+        time.time()
+    ):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def use_read_alias(alias):
+    """Направляет чтения текущего контекста на alias; возвращает токен."""
+    return _read_alias.set(alias)
+
+
+def reset_read_alias(token):
+    _read_alias.reset(token)
+
+
+def mark_sticky(response):
+    until = str(int(time.time() + settings.REPLICA_STICKY_SECONDS) + 1)
+    response.set_cookie(
+        settings.REPLICA_STICKY_COOKIE,
+        until,
+        max_age=settings.REPLICA_STICKY_SECONDS + 1,
+        httponly=True
+    )
+    response[STICKY_HEADER] = until
+
+
+class ReplicaRouter:
+    """Роутер баз данных: чтение с выбранной реплики, запись в default."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат копию основной базы, поэтому объекты
+        # из них можно связывать с объектами основной базы.
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,217 @@
+"""Ограничение частоты запросов к эндпоинтам регистрации и выдачи токена.
+
+Лимиты считаются «корзиной токенов»: корзина вмещает столько запросов,
+сколько разрешено за период, и равномерно пополняется. Запрос расходует
+по токену из каждой своей корзины, только если все корзины его
+пропускают: отклонённый запрос не уменьшает остальные лимиты.
+По умолчанию корзины хранятся в памяти процесса; если задан
+THROTTLE_BUCKET_CACHE, они хранятся в общем кеше Django.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+IDENTITY_FIELDS = ('username', 'email')
+# Блокировки корзин в общем кеше: срок жизни (на случай падения
+# процесса), время ожидания и интервал проверки, в секундах.
+LOCK_TIMEOUT = 1
+LOCK_WAIT = 0.1
+LOCK_POLL_INTERVAL = 0.002
+
+
+def take_token(state, capacity, refill_rate, now):
+    """Новое состояние корзины и время ожидания (0 - запрос разрешён)."""
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill_rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill_rate
+
+
+def take_tokens(states, buckets, now):
+    """Новые состояния корзин запроса и время ожидания.
+
+    buckets - кортежи (ключ, ёмкость, скорость пополнения, срок хранения).
+    Если хотя бы одна корзина не пропускает запрос, состояния
+    не возвращаются, и токены не расходуются.
+    """
+    new_states = {}
+    wait = 0
+    for key, capacity, refill_rate, _ in buckets:
+        new_states[key], bucket_wait = take_token(
+            states.get(key), capacity, refill_rate, now
+        )
+        wait = max(wait, bucket_wait)
+    return ({} if wait else new_states), wait
+
+
+class LocalBucketStore:
+    """Корзины процесса; самые давние вытесняются после max_size ключей."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, buckets, now):
+        with self._lock:
+            new_states, wait = take_tokens(self._buckets, buckets, now)
+            for key, state in new_states.items():
+                self._buckets[key] = state
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_size:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """Корзины в кеше Django, общие для всех процессов.
+
+    Корзины запроса читаются и записываются под блокировками, которые
+    берутся через cache.add: он атомарен в Memcached, Redis,
+    DatabaseCache и LocMemCache, но не в FileBasedCache. Если
+    блокировку не удалось получить за LOCK_WAIT, запрос отклоняется.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @staticmethod
+    def acquire(cache, lock_key):
+        deadline = time.monotonic() + LOCK_WAIT
+        while not cache.add(lock_key, True, LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(LOCK_POLL_INTERVAL)
+        return True
+
+    def take(self, buckets, now):
+        cache = caches[self.alias]
+        locked = []
+        try:
+            # Общий порядок блокировок исключает взаимную блокировку.
+            for key in sorted(key for key, *_ in buckets):
+                if not self.acquire(cache, f'{key}:lock'):
+                    return LOCK_WAIT
+                locked.append(f'{key}:lock')
+            new_states, wait = take_tokens(
+                cache.get_many([key for key, *_ in buckets]), buckets, now
+            )
+            for key, _, _, timeout in buckets:
+                if key in new_states:
+                    cache.set(key, new_states[key], timeout)
+            return wait
+        finally:
+            cache.delete_many(locked)
+
+
+local_buckets = LocalBucketStore(settings.THROTTLE_BUCKET_MAX_KEYS)
+
+
+def get_bucket_store():
+    if settings.THROTTLE_BUCKET_CACHE:
+        return CacheBucketStore(settings.THROTTLE_BUCKET_CACHE)
+    return local_buckets
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Базовый класс: лимит по scope из DEFAULT_THROTTLE_RATES.
+
+    Корзины ведутся отдельно для каждого эндпоинта. Наследники
+    возвращают идентификаторы клиента из get_idents.
+    """
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+
+    def get_idents(self, request):
+        raise NotImplementedError('.get_idents() must be overridden')
+
+    def get_buckets(self, request):
+        if self.rate is None:
+            return []
+        url_name = request.resolver_match.url_name
+        return [
+            (
+                f'throttle:{self.scope}:{url_name}:{ident}',
+                self.num_requests,
+                self.num_requests / self.duration,
+                self.duration
+            )
+            for ident in self.get_idents(request)
+        ]
+
+    def allow_request(self, request, view):
+        self.wait_time = get_bucket_store().take(
+            self.get_buckets(request), self.timer()
+        )
+        return not self.wait_time
+
+    def wait(self):
+        return self.wait_time
+
+
+class CombinedThrottle(BaseThrottle):
+    """Лимиты нескольких классов, которые расходуются только вместе.
+
+    DRF вызывает каждый класс throttle_classes независимо, и запрос,
+    отклонённый одним лимитом, расходовал бы остальные.
+    """
+
+    throttle_classes = ()
+    timer = time.time
+
+    def allow_request(self, request, view):
+        buckets = [
+            bucket
+            for throttle_class in self.throttle_classes
+            for bucket in throttle_class().get_buckets(request)
+        ]
+        self.wait_time = get_bucket_store().take(buckets, self.timer())
+        return not self.wait_time
+
+    def wait(self):
+        return self.wait_time
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Лимит запросов с одного IP-адреса."""
+
+    scope = 'auth_ip'
+
+    def get_idents(self, request):
+        return (self.get_ident(request),)
+
+
+class AuthIdentityThrottle(TokenBucketThrottle):
+    """Лимит запросов для одного username и одного email с любых IP.
+
+    Ограничивает письма на один адрес, даже если запросы идут с разных
+    IP. Чужие запросы могут исчерпать лимит пользователя, поэтому он
+    выше, чем нужно для обычных повторных попыток.
+    """
+
+    scope = 'auth_identity'
+
+    def get_idents(self, request):
+        data = request.data if isinstance(request.data, dict) else {}
+        return tuple(
+            f'{field}:{str(data[field]).lower()}'
+            for field in IDENTITY_FIELDS
+            if data.get(field)
+        )
+
+
+class AuthThrottle(CombinedThrottle):
+    """Лимиты auth/signup/ и auth/token/: по IP и по username и email."""
+
+    throttle_classes = (AuthIPThrottle, AuthIdentityThrottle)
@@ -1,8 +1,20 @@
+import hashlib
+import json
 import random
 
 from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
 
-from reviews.models import User
+from api.serializers import TitleBulkItemSerializer
+from reviews.models import Category, Genre, Title
+
+SLUG_NOT_FOUND_ERROR = 'Объект с slug={} не существует.'
+DUPLICATE_EXTERNAL_ID_ERROR = (
+    'Произведение с таким external_id уже есть в пакете.'
+)
+TITLE_BULK_FIELDS = ('name', 'year', 'description', 'category')
+BULK_UPSERT_ATTEMPTS = 2
 
 
 def generate_confirmation_code() -> str:
@@ -14,6 +26,180 @@ def generate_confirmation_code() -> str:
     )
 
 
-def save_use_confirmation_code(user: User) -> None:
-    user.confirmation_code = settings.USED_CODE_VALUE
-    user.save(update_fields=['confirmation_code'])
+def get_confirmation_code_key(username: str, code: str = None) -> str:
+    key = f'confirmation-code:{username}'
+    return key if code is None else f'{key}:{code}'
+
+
+def set_confirmation_code(username: str) -> str:
+    """Выдаёт новый код; прежние коды пользователя перестают действовать.
+
+    Действующий код хранится под ключом пользователя, а отметка
+    о том, что код ещё не использован, - под ключом, включающим код.
+    """
+    code = generate_confirmation_code()
+    store = caches[settings.CONFIRMATION_CODE_CACHE]
+    store.set(
+        get_confirmation_code_key(username, code),
+        True,
+        settings.CONFIRMATION_CODE_TIMEOUT
+    )
+    store.set(
+        get_confirmation_code_key(username),
+        code,
+        settings.CONFIRMATION_CODE_TIMEOUT
+    )
+    return code
+
+
+def consume_confirmation_code(username: str, code: str) -> bool:
+    """Погашает действующий код пользователя, в том числе при неверной попытке.
+
+    Удаляется отметка именно того кода, который был прочитан, поэтому
+    код, выданный повторной регистрацией между чтением и удалением,
+    остаётся действовать. Подтверждение проходит только у запроса,
+    удаление которого было успешным: удаление ключа атомарно в кешах
+    Django (в памяти, файловом, в базе данных, Memcached, Redis), и код
+    нельзя использовать дважды даже при параллельных запросах.
+    """
+    store = caches[settings.CONFIRMATION_CODE_CACHE]
+    stored_code = store.get(get_confirmation_code_key(username))
+    return (
+        stored_code is not None
+        and store.delete(get_confirmation_code_key(username, stored_code))
+        and stored_code == code
+    )
+
+
+def get_request_signature(request, ignored_params=()):
+    """Хеш пути и параметров запроса для ключей кеша."""
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        if key not in ignored_params
+        for value in values
+    )
+    return hashlib.md5(
+        json.dumps([request.path, params]).encode()
+    ).hexdigest()
+
+
+def validate_bulk_titles(items):
+    """Проверяем элементы пакета без обращений к БД.
+
+    Возвращаем словарь external_id -> (индекс, данные) и ошибки
+    по индексам элементов.
+    """
+    valid, errors = {}, {}
+    for index, item in enumerate(items):
+        serializer = TitleBulkItemSerializer(data=item)
+        if not serializer.is_valid():
+            errors[index] = serializer.errors
+        elif serializer.validated_data['external_id'] in valid:
+            errors[index] = dict(external_id=[DUPLICATE_EXTERNAL_ID_ERROR])
+        else:
+            valid[serializer.validated_data['external_id']] = (
+                index, serializer.validated_data
+            )
+    return valid, errors
+
+
+def save_bulk_titles(resolved, genres, categories):
+    """Записываем произведения пакета и их жанры в одной транзакции.
+
+    Возвращаем произведения, существовавшие до записи, и словарь
+    external_id -> id.
+    """
+    with transaction.atomic():
+        existing = Title.objects.in_bulk(
+            list(resolved), field_name='external_id'
+        )
+        new_titles, changed_titles = [], []
+        for external_id, (_, data) in resolved.items():
+            title = existing.get(external_id, Title(external_id=external_id))
+            title.name = data['name']
+            title.year = data['year']
+            title.description = data.get('description')
+            title.category = categories.get(data.get('category'))
+            (changed_titles if title.pk else new_titles).append(title)
+        Title.objects.bulk_create(new_titles)
+        Title.objects.bulk_update(changed_titles, TITLE_BULK_FIELDS)
+        title_ids = dict(
+            Title.objects.filter(
+                external_id__in=list(resolved)
+            ).values_list('external_id', 'id')
+        )
+        title_genre = Title.genre.through
+        title_genre.objects.filter(
+            title_id__in=[title.pk for title in changed_titles]
+        ).delete()
+        title_genre.objects.bulk_create(
+            title_genre(
+                title_id=title_ids[external_id], genre_id=genres[slug].pk
+            )
+            for external_id, (_, data) in resolved.items()
+            for slug in dict.fromkeys(data['genre'])
+        )
+    return existing, title_ids
+
+
+def bulk_upsert_titles(items):
+    """Создаём или обновляем произведения пакета по external_id.
+
+    Слаги жанров и категорий разрешаются одним запросом на модель,
+    произведения и их жанры записываются bulk-запросами в одной транзакции.
+    Элементы с ошибками пропускаются, остальные сохраняются.
+    """
+    valid, errors = validate_bulk_titles(items)
+    genres = Genre.objects.in_bulk(
+        {slug for _, data in valid.values() for slug in data['genre']},
+        field_name='slug'
+    )
+    categories = Category.objects.in_bulk(
+        {data.get('category') for _, data in valid.values()} - {None},
+        field_name='slug'
+    )
+    resolved = {}
+    for external_id, (index, data) in valid.items():
+        item_errors = {}
+        missing_genres = [
+            slug for slug in data['genre'] if slug not in genres
+        ]
+        if missing_genres:
+            item_errors['genre'] = [
+                SLUG_NOT_FOUND_ERROR.format(slug) for slug in missing_genres
+            ]
+        category = data.get('category')
+        if category is not None and category not in categories:
+            item_errors['category'] = [SLUG_NOT_FOUND_ERROR.format(category)]
+        if item_errors:
+            errors[index] = item_errors
+        else:
+            resolved[external_id] = (index, data)
+
+    # Параллельный пакет может создать произведение с тем же external_id
+    # между чтением существующих и bulk_create: тогда транзакция
+    # повторяется, и такое произведение уже обновляется.
+    for attempt in range(BULK_UPSERT_ATTEMPTS):
+        try:
+            existing, title_ids = save_bulk_titles(
+                resolved, genres, categories
+            )
+            break
+        except IntegrityError:
+            if attempt == BULK_UPSERT_ATTEMPTS - 1:
+                raise
+
+    results = [
+        dict(index=index, errors=item_errors)
+        for index, item_errors in errors.items()
+    ]
+    results.extend(
+        dict(
+            index=index,
+            id=title_ids[external_id],
+            status='updated' if external_id in existing else 'created'
+        )
+        for external_id, (index, _) in resolved.items()
+    )
+    return sorted(results, key=lambda result: result['index'])
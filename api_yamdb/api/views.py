@@ -1,39 +1,66 @@
+from operator import attrgetter
+
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.core.cache import cache
+from django.db import IntegrityError, router, transaction
+from django.db.models import (
+    Count, ExpressionWrapper, F, IntegerField, Subquery,
+    prefetch_related_objects
+)
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import (
-    filters, permissions, status, viewsets
+    filters, generics, permissions, status, viewsets
+)
+from rest_framework.decorators import (
+    action, api_view, permission_classes, throttle_classes
 )
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.settings import api_settings
 
-from api.filters import TitleFilter
+from api.authentication import get_access_token, get_full_user
+from api.filters import PublicationFilter, TitleFilter
+from api.mixins import (
+    AuthorConditionalWriteMixin, NestedParentMixin, ReplicaReadMixin,
+    SparseFieldsQuerysetMixin
+)
+from api.pagination import PublicationPagination, TitlePagination
+from api.parsers import NDJSONParser
 from api.permissions import (
     AdminOrReadOnly, AdminOnly, AdminOrModeratorOrOwnerOrReadOnly
 )
 from api.serializers import (
     SignupSerializer, AuthUserInfoSerializer, CategorySerializer,
     CommentSerializer, GenreSerializer, GetTokenSerializer,
-    ReviewSerializer, TitleSerializer, TitleWriteSerializer,
-    UserSerializer,
+    ReviewSerializer, TitleFastReadSerializer, TitleSerializer,
+    TitleWriteSerializer, UserReviewSerializer, UserSerializer,
 )
+from api.throttling import AuthThrottle
 from api.utils import (
-    generate_confirmation_code, save_use_confirmation_code
+    bulk_upsert_titles, consume_confirmation_code, get_request_signature,
+    set_confirmation_code
 )
 from api.viewsets import CreateListDestroyAdminOrReadLookupSearchFilterViewSet
-from reviews.models import Category, Genre, Review, Title, User
-
+from reviews.models import (
+    Category, Genre, Review, Title, User, author_prefetch
+)
+from reviews.outbox import enqueue_email
+from reviews.sharding import get_shard, merge_shards
+from reviews.signals import recalculate_rating
+
+TITLE_FACETS_IGNORED_PARAMS = ('page', 'cursor', 'count', 'fields', 'omit')
+TITLE_BULK_LIST_ERROR = 'Ожидается список произведений.'
+TITLE_BULK_SIZE_ERROR = 'В пакете не может быть больше {} произведений.'
+REVIEW_EXISTS_ERROR = 'Вы уже оставляли отзыв на это произведение.'
 USER_EXISTS_ERROR = 'Пользователь с таким {} уже существует.'
 USERNAME_EXISTS_ERROR = dict(username=USER_EXISTS_ERROR.format('username'))
 EMAIL_EXISTS_ERROR = dict(email=USER_EXISTS_ERROR.format('email'))
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsQuerysetMixin, viewsets.ModelViewSet):
     permission_classes = (AdminOnly,)
     serializer_class = UserSerializer
     queryset = User.objects.all()
@@ -51,11 +78,12 @@ class UserViewSet(viewsets.ModelViewSet):
     def auth_user_info(self, request):
         if request.method == 'GET':
             return Response(
-                UserSerializer(instance=request.user).data,
+                UserSerializer(instance=get_full_user(request.user)).data,
                 status=status.HTTP_200_OK
             )
+        # Экземпляр из кеша общий для запросов, поэтому меняем свежую копию.
         serializer = AuthUserInfoSerializer(
-            instance=request.user,
+            instance=get_object_or_404(User, pk=request.user.id),
             data=request.data,
             partial=True
         )
@@ -63,14 +91,44 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(methods=['GET'], detail=True, url_path='reviews')
+    def reviews(self, request, username=None):
+        """Последние отзывы пользователя из всех шардов."""
+        reviews = merge_shards(
+            Review.objects.filter(
+                author_id=self.get_object().id
+            ).order_by('-pub_date', '-id'),
+            key=attrgetter('pub_date'),
+            limit=settings.USER_REVIEWS_LIMIT
+        )
+        prefetch_related_objects(reviews, author_prefetch())
+        return Response(
+            UserReviewSerializer(
+                reviews, many=True, context=self.get_serializer_context()
+            ).data,
+            status=status.HTTP_200_OK
+        )
+
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([AuthThrottle])
 def auth_signup(request):
     serializer = SignupSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     try:
-        user, _ = User.objects.get_or_create(**serializer.validated_data)
+        with transaction.atomic(using=router.db_for_write(User)):
+            user, _ = User.objects.get_or_create(
+                **serializer.validated_data
+            )
+            # Письмо отправит send_outbox_emails, если транзакция
+            # зафиксирована.
+            enqueue_email(
+                subject='Код подтверждения учетной записи',
+                body=f'Для подтверждения учетной записи введите код:'
+                     f' {set_confirmation_code(user.username)}',
+                recipient=user.email
+            )
     except IntegrityError:
         username = serializer.validated_data['username']
         duplicate_username = User.objects.filter(username=username).exists()
@@ -79,17 +137,6 @@ def auth_signup(request):
             if duplicate_username
             else EMAIL_EXISTS_ERROR
         )
-
-    user.confirmation_code = generate_confirmation_code()
-    user.save(update_fields=['confirmation_code'])
-    send_mail(
-        subject='Код подтверждения учетной записи',
-        message=f'Для подтверждения учетной записи введите код:'
-                f' {user.confirmation_code}',
-        from_email=settings.FROM_EMAIL,
-        recipient_list=(user.email,),
-        fail_silently=False
-    )
     return Response(
         {**serializer.validated_data},
         status=status.HTTP_200_OK
@@ -98,6 +145,7 @@ def auth_signup(request):
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([AuthThrottle])
 def get_token(request):
     serializer = GetTokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -106,16 +154,12 @@ def get_token(request):
     confirmation_code = validated_data['confirmation_code']
     user = get_object_or_404(User, username=username)
 
-    if confirmation_code == user.confirmation_code:
-        save_use_confirmation_code(user)
-        token = RefreshToken.for_user(user).access_token
+    if consume_confirmation_code(user.username, confirmation_code):
+        token = get_access_token(user)
         return Response(
             dict(token=str(token)),
             status=status.HTTP_200_OK
         )
-    elif confirmation_code != settings.USED_CODE_VALUE:
-        save_use_confirmation_code(user)
-
     raise ValidationError(
         dict(
             message='Некорректный код подтверждения. Запросите новый код.'
@@ -123,43 +167,113 @@ def get_token(request):
     )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ReplicaReadMixin,
+    AuthorConditionalWriteMixin,
+    NestedParentMixin,
+    SparseFieldsQuerysetMixin,
+    viewsets.ModelViewSet
+):
     serializer_class = ReviewSerializer
+    parent_model = Title
+    parent_field = 'title'
+    parent_lookups = (('title_id', 'pk'),)
+    sparse_field_sources = {'author': ('author',)}
+    sparse_prefetch_related = (author_prefetch(),)
     permission_classes = [
         AdminOrModeratorOrOwnerOrReadOnly,
     ]
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = PublicationFilter
+    pagination_class = PublicationPagination
     http_method_names = ['get', 'post', 'patch', 'delete', 'options']
 
     def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs['title_id'])
+        return self.get_parent()
 
     def get_queryset(self):
-        return self.get_title().reviews.select_related('author').all()
+        return self.get_title().reviews.with_authors()
 
     def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user, title=self.get_title()
-        )
+        # Повторный отзыв отсекает ограничение unique_author_title:
+        # предварительная проверка не защищает от параллельных запросов.
+        # Review.save выполняется в своей транзакции (точке сохранения).
+        title = self.get_title()
+        try:
+            serializer.save(
+                author=get_full_user(self.request.user), title=title
+            )
+        except IntegrityError:
+            if not Review.objects.for_title(title.id).filter(
+                author_id=self.request.user.id, title=title
+            ).exists():
+                raise
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [REVIEW_EXISTS_ERROR]}
+            )
+
+    def perform_conditional_update(self, queryset, data):
+        # queryset.update не отправляет сигналы, поэтому сумму оценок
+        # произведения поправляем до изменения отзыва, пока в нём
+        # ещё старая оценка.
+        if 'score' not in data:
+            return super().perform_conditional_update(queryset, data)
+        title_id = self.kwargs['title_id']
+        if get_shard(title_id) is not None:
+            # Отзыв и произведение в разных базах: после изменения
+            # пересчитываем рейтинг по отзывам шарда.
+            updated = super().perform_conditional_update(queryset, data)
+            if updated:
+                recalculate_rating(title_id)
+            return updated
+        with transaction.atomic():
+            Title.objects.filter(pk=title_id).update(
+                score_sum=F('score_sum') + data['score'] - Coalesce(
+                    Subquery(queryset.values('score')[:1]), data['score']
+                )
+            )
+            return super().perform_conditional_update(queryset, data)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ReplicaReadMixin,
+    AuthorConditionalWriteMixin,
+    NestedParentMixin,
+    SparseFieldsQuerysetMixin,
+    viewsets.ModelViewSet
+):
     serializer_class = CommentSerializer
+    parent_model = Review
+    parent_field = 'review'
+    parent_lookups = (('review_id', 'pk'), ('title_id', 'title_id'))
+    sparse_field_sources = {'author': ('author',)}
+    sparse_prefetch_related = (author_prefetch(),)
     permission_classes = [
         AdminOrModeratorOrOwnerOrReadOnly
     ]
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = PublicationFilter
+    pagination_class = PublicationPagination
     http_method_names = ['get', 'post', 'patch', 'delete', 'options']
 
     def get_review(self):
-        return get_object_or_404(Review, pk=self.kwargs['review_id'])
+        return self.get_parent()
+
+    def get_parent_queryset(self):
+        return Review.objects.for_title(self.kwargs['title_id'])
 
     def get_queryset(self):
-        return self.get_review().comments.select_related('author').all()
+        return self.get_review().comments.with_authors()
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(
+            author=get_full_user(self.request.user), review=self.get_review()
+        )
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ReplicaReadMixin, SparseFieldsQuerysetMixin, viewsets.ModelViewSet
+):
     """Класс для выполнения операций с моделью Title.
 
     -в поле queryset - выбираем объект модели, с которой будет работать вьюсет;
@@ -167,13 +281,20 @@ class TitleViewSet(viewsets.ModelViewSet):
     для валидации и сериализации;
     """
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).order_by(*Title._meta.ordering)
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by(*Title._meta.ordering)
     serializer_class = TitleSerializer
+    sparse_field_sources = {
+        'rating': ('score_sum', 'reviews_count'),
+        'category': ('category', 'category__name', 'category__slug')
+    }
+    sparse_select_related = ('category',)
+    sparse_prefetch_related = ('genre',)
     permission_classes = [AdminOrReadOnly]
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    pagination_class = TitlePagination
     http_method_names = ['get', 'post', 'patch', 'delete', 'options']
 
     def get_serializer_class(self):
@@ -181,6 +302,124 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleSerializer
         return TitleWriteSerializer
 
+    @action(
+        methods=['POST'],
+        detail=False,
+        url_path='bulk',
+        permission_classes=(AdminOnly,),
+        parser_classes=(JSONParser, NDJSONParser)
+    )
+    def bulk(self, request):
+        """Пакетно создаём или обновляем произведения по external_id."""
+        if not isinstance(request.data, list):
+            raise ValidationError(dict(non_field_errors=TITLE_BULK_LIST_ERROR))
+        if len(request.data) > settings.TITLE_BULK_MAX_ITEMS:
+            raise ValidationError(dict(
+                non_field_errors=TITLE_BULK_SIZE_ERROR.format(
+                    settings.TITLE_BULK_MAX_ITEMS
+                )
+            ))
+        results = bulk_upsert_titles(request.data)
+        statuses = [result.get('status', 'error') for result in results]
+        return Response(
+            dict(
+                created=statuses.count('created'),
+                updated=statuses.count('updated'),
+                errors=statuses.count('error'),
+                results=results
+            ),
+            status=status.HTTP_200_OK
+        )
+
+    @action(methods=['GET'], detail=False, url_path='facets')
+    def facets(self, request):
+        """Количество произведений по категориям, жанрам и десятилетиям.
+
+        Принимает те же параметры, что и список произведений; на каждое
+        измерение выполняется один запрос с группировкой.
+        """
+        cache_key = 'title-facets:' + get_request_signature(
+            request, TITLE_FACETS_IGNORED_PARAMS
+        )
+        facets = cache.get(cache_key)
+        if facets is None:
+            facets = self.count_facets()
+            cache.set(cache_key, facets, settings.TITLE_FACETS_CACHE_TIMEOUT)
+        return Response(facets, status=status.HTTP_200_OK)
+
+    def count_facets(self):
+        title_ids = self.filter_queryset(
+            self.get_queryset()
+        ).order_by().values('pk')
+        titles = Title.objects.filter(pk__in=title_ids).order_by()
+        return dict(
+            category=[
+                dict(slug=slug, count=count)
+                for slug, count in titles.filter(
+                    category__isnull=False
+                ).values_list('category__slug').annotate(
+                    count=Count('pk')
+                ).order_by('category__slug')
+            ],
+            genre=[
+                dict(slug=slug, count=count)
+                for slug, count in Title.genre.through.objects.filter(
+                    title_id__in=title_ids
+                ).values_list('genre__slug').annotate(
+                    count=Count('title_id')
+                ).order_by('genre__slug')
+            ],
+            decade=[
+                dict(decade=decade, count=count)
+                for decade, count in titles.annotate(
+                    decade=ExpressionWrapper(
+                        F('year') / 10 * 10, output_field=IntegerField()
+                    )
+                ).values_list('decade').annotate(
+                    count=Count('pk')
+                ).order_by('decade')
+            ],
+        )
+
+    def get_fast_read_serializer(self):
+        return TitleFastReadSerializer(
+            TitleSerializer.get_sparse_fields(self.request)
+        )
+
+    def get_fast_read_queryset(self, serializer):
+        """Строки values() для быстрого чтения с полями для курсора."""
+        return self.filter_queryset(self.get_queryset()).prefetch_related(
+            None
+        ).values(
+            *serializer.get_values_fields(),
+            *(field.lstrip('-') for field in self.paginator.ordering)
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not settings.TITLE_FAST_READ:
+            return super().list(request, *args, **kwargs)
+        serializer = self.get_fast_read_serializer()
+        page = self.paginate_queryset(
+            self.get_fast_read_queryset(serializer)
+        )
+        if page is None:
+            return Response(serializer.to_representation(
+                list(self.get_fast_read_queryset(serializer))
+            ))
+        return self.get_paginated_response(
+            serializer.to_representation(page)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if not settings.TITLE_FAST_READ:
+            return super().retrieve(request, *args, **kwargs)
+        serializer = self.get_fast_read_serializer()
+        row = generics.get_object_or_404(
+            self.get_fast_read_queryset(serializer),
+            pk=self.kwargs[self.lookup_field]
+        )
+        return Response(serializer.to_representation([row])[0])
+
 
 class GenreViewSet(CreateListDestroyAdminOrReadLookupSearchFilterViewSet):
     """Класс для выполнения операций с моделью Genre."""
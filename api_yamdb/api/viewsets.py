@@ -1,9 +1,11 @@
 from rest_framework import filters, mixins, viewsets
 
+from api.mixins import ReplicaReadMixin
 from api.permissions import AdminOrReadOnly
 
 
 class CreateListDestroyAdminOrReadLookupSearchFilterViewSet(
+    ReplicaReadMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
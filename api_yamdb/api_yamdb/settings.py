@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,6 +41,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'api.profiling.ServerTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -69,7 +72,98 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    # Копия основной базы только для чтения (см. DATABASE_REPLICAS).
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv(
+            'DATABASE_REPLICA_NAME', BASE_DIR / 'db_replica.sqlite3'
+        ),
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db_replica.sqlite3',
+        },
+    },
+    # База пользователей и авторизации, если USERS_DATABASE = 'users'.
+    'users': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv(
+            'DATABASE_USERS_NAME', BASE_DIR / 'db_users.sqlite3'
+        ),
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db_users.sqlite3',
+        },
+    },
+}
+
+# Шарды отзывов и комментариев (reviews.sharding): при REVIEW_SHARDING
+# строки хранятся в базе, выбранной по хешу title_id.
+REVIEW_SHARDS = tuple(
+    f'reviews_shard_{number}'
+    for number in range(int(os.getenv('REVIEW_SHARD_COUNT', '2')))
+)
+REVIEW_SHARDING = os.getenv('REVIEW_SHARDING', 'false').lower() == 'true'
+DATABASES.update({
+    alias: {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db_{alias}.sqlite3',
+        'TEST': {
+            'NAME': BASE_DIR / f'test_db_{alias}.sqlite3',
+        },
     }
+    for alias in REVIEW_SHARDS
+})
+
+DATABASE_ROUTERS = (
+    'reviews.sharding.ShardRouter',
+    'reviews.routers.UsersRouter',
+    'api.replicas.ReplicaRouter',
+)
+# Алиас базы пользователей, очереди писем и приложений auth, contenttypes,
+# admin и sessions (reviews.routers); каталог остаётся в default.
+# Переход с одной базы: migrate --database users, split_users_database.
+USERS_DATABASE = os.getenv('USERS_DATABASE', 'default')
+# Алиасы копий основной базы: они наполняются репликацией, а не миграциями.
+# При REPLICA_READS GET-запросы каталога читают с них (api.replicas).
+# После записи клиент REPLICA_STICKY_SECONDS секунд читает из основной
+# базы; момент окончания передаётся в cookie REPLICA_STICKY_COOKIE или
+# в заголовке X-Primary-Until.
+DATABASE_REPLICAS = ('replica',)
+REPLICA_READS = os.getenv('REPLICA_READS', 'false').lower() == 'true'
+REPLICA_STICKY_SECONDS = 5
+REPLICA_STICKY_COOKIE = 'primary_until'
+
+# default - кеш процесса; shared - общий для процессов (воркеров) сервера,
+# в нём хранится то, что должны видеть все процессы. Файловый кеш общий
+# только на одной машине, для нескольких серверов нужен, например,
+# Memcached или Redis (SHARED_CACHE_BACKEND и SHARED_CACHE_LOCATION).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': os.getenv(
+            'SHARED_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        # Значения хранятся в pickle и включают коды подтверждения,
+        # поэтому каталог по умолчанию - в проекте, а не в общем /tmp.
+        'LOCATION': os.getenv(
+            'SHARED_CACHE_LOCATION', str(BASE_DIR / 'shared_cache')
+        ),
+    },
+}
+
+# PRAGMA, которые reviews.sqlite выполняет при каждом подключении к SQLite.
+# WAL позволяет читать во время записи, synchronous=NORMAL в режиме WAL
+# не fsync-ит каждую транзакцию, busy_timeout (мс) - сколько ждать чужую
+# блокировку вместо "database is locked"; cache_size < 0 задаётся в КиБ.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'normal'),
+    'busy_timeout': os.getenv('SQLITE_BUSY_TIMEOUT', '5000'),
+    'cache_size': os.getenv('SQLITE_CACHE_SIZE', '-20000'),
+    'mmap_size': os.getenv('SQLITE_MMAP_SIZE', str(128 * 1024 ** 2)),
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'memory'),
 }
 
 
@@ -114,25 +208,91 @@ AUTH_USER_MODEL = 'reviews.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
 
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.OptionalCountPagination',
     'PAGE_SIZE': 5,
-}
 
+    # Лимиты auth/signup/ и auth/token/ (api.throttling): с одного IP
+    # и для одного username или email с любых IP. Второй лимит могут
+    # исчерпать чужие запросы, поэтому он с запасом для повторных попыток.
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '30/min',
+        'auth_identity': '10/min',
+    },
+}
 
+# Алиас кеша для корзин api.throttling; None - корзины в памяти процесса,
+# не больше THROTTLE_BUCKET_MAX_KEYS ключей.
+THROTTLE_BUCKET_CACHE = None
+THROTTLE_BUCKET_MAX_KEYS = 10000
+
+# Время жизни (в секундах) кешированного количества объектов в пагинации;
+# 0 - количество считается при каждом запросе.
+PAGINATION_COUNT_CACHE_TIMEOUT = 0
+
+# Отдавать список и карточку произведения без полей DRF
+# (api.serializers.TitleFastReadSerializer).
+TITLE_FAST_READ = True
+
+# Время жизни (в секундах) кешированных счётчиков /titles/facets/.
+TITLE_FACETS_CACHE_TIMEOUT = 60
+
+# Максимальное количество произведений в одном запросе к /titles/bulk/.
+TITLE_BULK_MAX_ITEMS = 5000
+
+# Общий каталог, в который процессы сохраняют метрики (api.metrics) не
+# реже раза в METRICS_FLUSH_INTERVAL секунд, чтобы /metrics суммировал
+# их; None - /metrics отдаёт метрики своего процесса.
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+METRICS_FLUSH_INTERVAL = 5
+# Токен, с которым Prometheus запрашивает /metrics (Authorization:
+# Bearer); None - адрес /metrics отключён.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+
+# Заголовки Server-Timing и X-DB-Queries в ответах и режим ?_explain=1
+# для администраторов (api.profiling).
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'false').lower() == 'true'
+
+# Сколько последних отзывов отдаёт /users/{username}/reviews/.
+USER_REVIEWS_LIMIT = 100
+
+# Размер и время жизни (в секундах) кеша пользователей процесса
+# (api.authentication.user_cache) и алиас общего кеша, в котором
+# отмечаются изменения пользователей.
+USER_CACHE_SIZE = 1024
+USER_CACHE_TIMEOUT = 60
+USER_CACHE_INVALIDATION_CACHE = 'shared'
+
+# Права из токена доступа действуют без запроса к базе, пока
+# пользователь не изменён (api.authentication). Обновления токена нет,
+# поэтому по умолчанию он действует сутки.
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
+    'ACCESS_TOKEN_LIFETIME': timedelta(
+        minutes=int(os.getenv('ACCESS_TOKEN_LIFETIME_MINUTES', '1440'))
+    ),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Очередь писем (reviews.outbox): размер пакета команды send_outbox_emails,
+# пауза между проверками очереди в режиме --loop, число попыток отправки
+# и задержка перед повтором (в секундах), удваивающаяся с каждой попыткой.
+# Захваченные обработчиком письма другие обработчики не выбирают
+# EMAIL_OUTBOX_CLAIM_TIMEOUT секунд.
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_POLL_INTERVAL = 5
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_OUTBOX_RETRY_MAX_DELAY = 3600
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 600
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -141,5 +301,9 @@ FROM_EMAIL = 'author@mail.ru'
 
 CONFORMATION_CODE_CHARACTER_SET = '0123456789'
 CONFIRMATION_CODE_LENGTH = 5
-USED_CODE_VALUE = '#' * CONFIRMATION_CODE_LENGTH
+# Коды подтверждения хранятся в кеше CONFIRMATION_CODE_CACHE и действуют
+# CONFIRMATION_CODE_TIMEOUT секунд. Кеш должен быть общим для всех
+# процессов сервера: код выдаёт один процесс, а проверяет другой.
+CONFIRMATION_CODE_CACHE = 'shared'
+CONFIRMATION_CODE_TIMEOUT = 60 * 60 * 24
 USER_PROFILE_PATH = 'me'
@@ -1,10 +1,17 @@
 from django.contrib import admin
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (
+    AUTHOR_DB_CONSTRAINT, Category, Comment, Genre, OutboxEmail, Review,
+    Title, User
+)
 
 # Глобально переопределяем в админке отображение NULL.
 admin.site.empty_value_display = '-пока пусто-'
 
+# Поиск и фильтр по автору требуют JOIN, возможный, только если
+# публикации хранятся в одной базе с пользователями.
+AUTHOR_LOOKUPS = ('author__username',) if AUTHOR_DB_CONSTRAINT else ()
+
 
 class GenreAndCategory(admin.ModelAdmin):
     """Заготовка для админок Жанры и Категории."""
@@ -32,7 +39,6 @@ class UserAdmin(admin.ModelAdmin):
         'username',
         'role',
         'email',
-        'confirmation_code',
     )
     list_display_links = (
         'username',
@@ -66,6 +72,10 @@ class TitleAdmin(admin.ModelAdmin):
         'category',
         'year',
     )
+    readonly_fields = (
+        'score_sum',
+        'reviews_count',
+    )
 
 
 @admin.register(Genre)
@@ -78,8 +88,23 @@ class CategoryAdmin(GenreAndCategory):
     """Переопределяем настройки интерфейса админки раздела категории."""
 
 
+class PublicationAdmin(admin.ModelAdmin):
+    """Заготовка для админок Отзывы и Комментарии.
+
+    Авторы могут храниться в другой базе (reviews.routers), поэтому
+    они подгружаются отдельным запросом, а не через JOIN.
+    """
+
+    raw_id_fields = (
+        'author',
+    )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_authors()
+
+
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(PublicationAdmin):
     """Переопределяем настройки интерфейса админки раздела Отзывы."""
 
     list_display = (
@@ -92,18 +117,21 @@ class ReviewAdmin(admin.ModelAdmin):
     list_display_links = (
         'text',
     )
+    list_select_related = (
+        'title',
+    )
     search_fields = (
         'text',
-        'author__username',
+        *AUTHOR_LOOKUPS,
     )
     list_filter = (
-        'author__username',
+        *AUTHOR_LOOKUPS,
         'pub_date',
     )
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(PublicationAdmin):
     """Переопределяем настройки интерфейса админки раздела Комментарии."""
 
     list_display = (
@@ -115,11 +143,45 @@ class CommentAdmin(admin.ModelAdmin):
     list_display_links = (
         'text',
     )
+    list_select_related = (
+        'review',
+    )
     search_fields = (
         'text',
-        'author__username',
+        *AUTHOR_LOOKUPS,
     )
     list_filter = (
-        'author__username',
+        *AUTHOR_LOOKUPS,
         'pub_date',
     )
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """Переопределяем настройки интерфейса админки раздела Очередь писем."""
+
+    list_display = (
+        'recipient',
+        'subject',
+        'created',
+        'attempts',
+        'next_attempt_at',
+        'sent_at',
+        'failed_at',
+    )
+    list_display_links = (
+        'recipient',
+    )
+    search_fields = (
+        'recipient',
+    )
+    list_filter = (
+        'sent_at',
+        'failed_at',
+    )
+    readonly_fields = (
+        'created',
+        'attempts',
+        'sent_at',
+        'last_error',
+    )
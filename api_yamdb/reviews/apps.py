@@ -1,7 +1,17 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
     verbose_name = 'Портал авторских произведений'
+
+    def ready(self):
+        import reviews.signals  # noqa: F401
+        from reviews.search import restore_search_index
+        from reviews.sqlite import apply_sqlite_pragmas
+
+        connection_created.connect(apply_sqlite_pragmas)
+        post_migrate.connect(restore_search_index, sender=self)
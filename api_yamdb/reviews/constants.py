@@ -5,3 +5,4 @@ LEN_OF_SYMBL = 25
 MAX_LENGTH_NAME = 256
 MAX_LENGTH_SLUG = 50
 USERNAME_LENGTH = 150
+EXTERNAL_ID_LENGTH = 64
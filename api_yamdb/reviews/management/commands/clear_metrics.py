@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from api.metrics import clear_metrics_directory
+
+
+class Command(BaseCommand):
+    help = ('Удаляет счётчики процессов из METRICS_DIR; запускается '
+            'перед стартом сервера.')
+
+    def handle(self, *args, **kwargs):
+        if not settings.METRICS_DIR:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'{timezone.now()}. METRICS_DIR не задан.'
+                )
+            )
+            return
+        removed = clear_metrics_directory()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{timezone.now()}. clear_metrics, файлов: {removed}'
+            )
+        )
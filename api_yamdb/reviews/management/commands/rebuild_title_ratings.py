@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from reviews.models import Review, Title
+from reviews.sharding import get_review_databases
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые суммы и количество оценок произведений.'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write(
+            self.style.SUCCESS(f'{timezone.now()}. start: rebuild_ratings')
+        )
+        updated = self.rebuild_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{timezone.now()}. end: rebuild_ratings, '
+                f'произведений: {updated}'
+            )
+        )
+
+    @classmethod
+    def rebuild_ratings(cls):
+        if settings.REVIEW_SHARDING:
+            return cls.rebuild_sharded_ratings()
+        title_reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return Title.objects.update(
+            score_sum=Coalesce(
+                Subquery(
+                    title_reviews.annotate(total=Sum('score')).values('total'),
+                    output_field=IntegerField()
+                ),
+                0
+            ),
+            reviews_count=Coalesce(
+                Subquery(
+                    title_reviews.annotate(total=Count('id')).values('total'),
+                    output_field=IntegerField()
+                ),
+                0
+            )
+        )
+
+    @staticmethod
+    def rebuild_sharded_ratings():
+        # Подзапрос к отзывам из другой базы невозможен: суммы считаем
+        # в каждом шарде и записываем пакетами.
+        titles = [
+            Title(pk=title_id, score_sum=score_sum, reviews_count=count)
+            for alias in get_review_databases()
+            for title_id, score_sum, count in Review.objects.using(
+                alias
+            ).order_by().values('title_id').annotate(
+                score_sum=Sum('score'), count=Count('id')
+            ).values_list('title_id', 'score_sum', 'count')
+        ]
+        with transaction.atomic():
+            updated = Title.objects.update(score_sum=0, reviews_count=0)
+            Title.objects.bulk_update(
+                titles, ('score_sum', 'reviews_count'), batch_size=BATCH_SIZE
+            )
+        return updated
@@ -0,0 +1,28 @@
+from django.core.management import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from reviews.search import create_search_index, uses_fts
+
+
+class Command(BaseCommand):
+    help = ('Пересоздаёт триггеры и заполняет полнотекстовый индекс '
+            'произведений.')
+
+    def handle(self, *args, **kwargs):
+        if not uses_fts():
+            self.stdout.write(
+                self.style.WARNING(
+                    f'{timezone.now()}. Полнотекстовый индекс используется '
+                    'только с SQLite.'
+                )
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f'{timezone.now()}. start: rebuild_search')
+        )
+        with connection.schema_editor() as schema_editor:
+            create_search_index(schema_editor)
+        self.stdout.write(
+            self.style.SUCCESS(f'{timezone.now()}. end: rebuild_search')
+        )
@@ -3,12 +3,14 @@ import os
 
 from django.apps import apps
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, call_command
+from django.db import DEFAULT_DB_ALIAS
 from django.utils import timezone
 
 from reviews.models import (
     Category, Comment, Genre, Review, Title, User
 )
+from reviews.sharding import is_sharded_model
 
 
 class Command(BaseCommand):
@@ -26,6 +28,11 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         self.check_files()
         self.seed_test_data()
+        if settings.REVIEW_SHARDING:
+            call_command('shard_reviews', stdout=self.stdout)
+        # bulk_create не отправляет сигналы, поэтому рейтинги
+        # произведений пересчитываем одним запросом после загрузки.
+        call_command('rebuild_title_ratings', stdout=self.stdout)
 
     def check_files(self):
         self.stdout.write(
@@ -53,6 +60,14 @@ class Command(BaseCommand):
             )
         )
 
+    @staticmethod
+    def get_manager(model):
+        # Отзывы и комментарии загружаются в основную базу, откуда
+        # при шардировании их копирует в шарды команда shard_reviews.
+        if is_sharded_model(model):
+            return model._base_manager.using(DEFAULT_DB_ALIAS)
+        return model.objects
+
     def seed_test_data(self):
         self.stdout.write(
             self.style.SUCCESS(f'{timezone.now()}. start: seed_test_data')
@@ -63,7 +78,7 @@ class Command(BaseCommand):
             ) as csv_file:
                 try:
                     reader = csv.DictReader(csv_file, delimiter=',')
-                    model.objects.bulk_create(
+                    self.get_manager(model).bulk_create(
                         [model(**data) for data in reader]
                     )
                 except Exception as e:
@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from reviews.outbox import deliver_pending_emails
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди пакетами через одно соединение '
+            'почтового бэкенда.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем, выбираемых из очереди за раз.'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval '
+                 'секунд.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+            help='Пауза между проверками очереди в режиме --loop.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed, retried = deliver_pending_emails(
+                options['batch_size']
+            )
+            if sent or failed or retried:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'{timezone.now()}. send_outbox_emails: '
+                        f'отправлено {sent}, отложено {retried}, '
+                        f'отказов {failed}'
+                    )
+                )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
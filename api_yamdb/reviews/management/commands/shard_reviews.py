@@ -0,0 +1,84 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from reviews.models import Comment, Review
+from reviews.schema import set_db_constraints
+from reviews.sharding import get_shard
+
+BATCH_SIZE = 1000
+SHARDING_DISABLED_ERROR = 'Шардирование выключено (REVIEW_SHARDING).'
+SHARD_NOT_EMPTY_ERROR = 'В шарде {} уже есть отзывы.'
+
+
+class Command(BaseCommand):
+    help = ('Копирует отзывы и комментарии из общей базы в шарды '
+            'по title_id (reviews.sharding).')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            default='default',
+            help='Алиас базы, из которой копируются отзывы и комментарии.'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.REVIEW_SHARDING:
+            raise CommandError(SHARDING_DISABLED_ERROR)
+        source = options['source']
+        for alias in settings.REVIEW_SHARDS:
+            if Review._base_manager.using(alias).exists():
+                raise CommandError(SHARD_NOT_EMPTY_ERROR.format(alias))
+        self.stdout.write(
+            self.style.SUCCESS(f'{timezone.now()}. start: shard_reviews')
+        )
+        with transaction.atomic(using=source):
+            for model, title_field in (
+                (Review, 'title_id'), (Comment, 'review__title_id')
+            ):
+                copied = self.copy_model(
+                    model._base_manager.using(source).annotate(
+                        shard_title_id=F(title_field)
+                    )
+                )
+                self.stdout.write(f'{model._meta.label}: {copied}')
+        for alias in settings.REVIEW_SHARDS:
+            connection = connections[alias]
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                    no_style(), (Review, Comment)
+                ):
+                    cursor.execute(sql)
+        # Отзывы в исходной базе остаются копией: внешние ключи на
+        # произведения и авторов не должны мешать их удалению.
+        set_db_constraints(
+            source,
+            (Review._meta.get_field('title'),
+             Review._meta.get_field('author'),
+             Comment._meta.get_field('author')),
+            db_constraint=False
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'{timezone.now()}. end: shard_reviews')
+        )
+
+    @staticmethod
+    def copy_model(queryset):
+        model = queryset.model
+        batches = defaultdict(list)
+        copied = 0
+        for obj in queryset.order_by('pk').iterator(chunk_size=BATCH_SIZE):
+            shard = get_shard(obj.shard_title_id)
+            batches[shard].append(obj)
+            if len(batches[shard]) == BATCH_SIZE:
+                copied += len(model._base_manager.using(shard).bulk_create(
+                    batches.pop(shard)
+                ))
+        for shard, batch in batches.items():
+            copied += len(model._base_manager.using(shard).bulk_create(batch))
+        return copied
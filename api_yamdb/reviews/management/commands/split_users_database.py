@@ -0,0 +1,98 @@
+from django.apps import apps
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.utils import timezone
+
+from reviews.models import Comment, Review, User
+from reviews.routers import is_users_model
+from reviews.schema import set_db_constraints
+
+BATCH_SIZE = 1000
+TARGET_NOT_EMPTY_ERROR = 'В базе {} уже есть пользователи.'
+
+
+class Command(BaseCommand):
+    help = ('Копирует пользователей и данные авторизации из общей базы '
+            'в базу пользователей (reviews.routers).')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            default='default',
+            help='Алиас общей базы, из которой копируются данные.'
+        )
+        parser.add_argument(
+            '--target',
+            default='users',
+            help='Алиас базы пользователей, к которой применены миграции '
+                 '(migrate --database users).'
+        )
+
+    def handle(self, *args, **options):
+        source, target = options['source'], options['target']
+        if source == target:
+            raise CommandError('Базы --source и --target совпадают.')
+        if User._base_manager.using(target).exists():
+            raise CommandError(TARGET_NOT_EMPTY_ERROR.format(target))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{timezone.now()}. start: split_users_database'
+            )
+        )
+        models = [
+            model for model in apps.get_models(include_auto_created=True)
+            if is_users_model(model)
+        ]
+        connection = connections[target]
+        with transaction.atomic(using=target):
+            with connection.constraint_checks_disabled():
+                for model in models:
+                    copied = self.copy_model(model, source, target)
+                    self.stdout.write(
+                        f'{model._meta.label}: {copied}'
+                    )
+            connection.check_constraints(
+                table_names=[model._meta.db_table for model in models]
+            )
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                    no_style(), models
+                ):
+                    cursor.execute(sql)
+        # Пользователи переезжают: внешние ключи публикаций на авторов
+        # в исходной базе больше не нужны.
+        set_db_constraints(
+            source,
+            (Review._meta.get_field('author'),
+             Comment._meta.get_field('author')),
+            db_constraint=False
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{timezone.now()}. end: split_users_database. '
+                f'Укажите USERS_DATABASE={target}.'
+            )
+        )
+
+    @staticmethod
+    def copy_model(model, source, target):
+        # Типы содержимого и права уже созданы миграциями в target,
+        # их заменяем строками из source с теми же id.
+        model._base_manager.using(target).all()._raw_delete(target)
+        copied = 0
+        batch = []
+        for obj in model._base_manager.using(source).order_by(
+            'pk'
+        ).iterator(chunk_size=BATCH_SIZE):
+            batch.append(obj)
+            if len(batch) == BATCH_SIZE:
+                copied += len(model._base_manager.using(target).bulk_create(
+                    batch
+                ))
+                batch = []
+        if batch:
+            copied += len(
+                model._base_manager.using(target).bulk_create(batch)
+            )
+        return copied
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 16:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_publication_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='external_id',
+            field=models.CharField(blank=True, help_text='Ключ произведения в каталоге-источнике', max_length=64, null=True, unique=True, verbose_name='Внешний идентификатор'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2 on 2026-10-18 17:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_publication_author_without_constraint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='reviews', to='reviews.title', verbose_name='Произведение'),
+        ),
+    ]
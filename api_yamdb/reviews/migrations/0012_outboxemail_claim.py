@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_review_title_without_constraint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='claim',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, help_text='Обработчик очереди, который отправляет письмо', null=True, verbose_name='Метка захвата'),
+        ),
+    ]
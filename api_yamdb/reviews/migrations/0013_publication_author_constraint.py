@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, migrations, models
+import django.db.models.deletion
+
+# То же условие, что reviews.models.AUTHOR_DB_CONSTRAINT: внешний ключ
+# создаётся, только если публикации хранятся в одной базе с авторами.
+AUTHOR_DB_CONSTRAINT = (
+    settings.USERS_DATABASE == DEFAULT_DB_ALIAS
+    and not settings.REVIEW_SHARDING
+)
+ON_DELETE = (
+    django.db.models.deletion.CASCADE if AUTHOR_DB_CONSTRAINT
+    else django.db.models.deletion.DO_NOTHING
+)
+
+
+class AlterFieldOutsideShards(migrations.AlterField):
+    """В шардах нет таблицы пользователей: там ключ остаётся без
+    ограничения в БД."""
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.alias not in settings.REVIEW_SHARDS:
+            super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.alias not in settings.REVIEW_SHARDS:
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_outboxemail_claim'),
+    ]
+
+    operations = [
+        AlterFieldOutsideShards(
+            model_name='comment',
+            name='author',
+            field=models.ForeignKey(db_constraint=AUTHOR_DB_CONSTRAINT, on_delete=ON_DELETE, related_name='comments', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        AlterFieldOutsideShards(
+            model_name='review',
+            name='author',
+            field=models.ForeignKey(db_constraint=AUTHOR_DB_CONSTRAINT, on_delete=ON_DELETE, related_name='reviews', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+    ]
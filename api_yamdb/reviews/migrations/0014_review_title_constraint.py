@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# То же условие, что reviews.models.TITLE_DB_CONSTRAINT: внешний ключ
+# создаётся, только если отзывы хранятся в одной базе с произведениями.
+TITLE_DB_CONSTRAINT = not settings.REVIEW_SHARDING
+ON_DELETE = (
+    django.db.models.deletion.CASCADE if TITLE_DB_CONSTRAINT
+    else django.db.models.deletion.DO_NOTHING
+)
+
+
+class AlterFieldOutsideShards(migrations.AlterField):
+    """В шардах нет таблицы произведений: там ключ остаётся без
+    ограничения в БД."""
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.alias not in settings.REVIEW_SHARDS:
+            super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.alias not in settings.REVIEW_SHARDS:
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_publication_author_constraint'),
+    ]
+
+    operations = [
+        AlterFieldOutsideShards(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(db_constraint=TITLE_DB_CONSTRAINT, on_delete=ON_DELETE, related_name='reviews', to='reviews.title', verbose_name='Произведение'),
+        ),
+    ]
@@ -3,12 +3,14 @@ from collections import namedtuple
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import DEFAULT_DB_ALIAS, models, router, transaction
+from django.utils import timezone
 
 from reviews.constants import (
-    EMAIL_LENGTH, LEN_OF_SYMBL, MAX_LENGTH_NAME,
+    EMAIL_LENGTH, EXTERNAL_ID_LENGTH, LEN_OF_SYMBL, MAX_LENGTH_NAME,
     MAX_LENGTH_SLUG, USERNAME_LENGTH, MIN_SCORE, MAX_SCORE
 )
+from reviews.sharding import get_shard
 from reviews.validators import validate_username, validate_year
 
 
@@ -35,13 +37,6 @@ class User(AbstractUser):
         blank=True,
         verbose_name='Биография'
     )
-    confirmation_code = models.CharField(
-        verbose_name='Код подтверждения',
-        blank=True,
-        null=True,
-        default=None,
-        max_length=settings.CONFIRMATION_CODE_LENGTH,
-    )
 
     email = models.EmailField(
         verbose_name='Почта',
@@ -108,15 +103,50 @@ class Title(models.Model):
         validators=(validate_year,),
         verbose_name='Год произведения',
     )
+    external_id = models.CharField(
+        max_length=EXTERNAL_ID_LENGTH,
+        unique=True,
+        blank=True,
+        null=True,
+        verbose_name='Внешний идентификатор',
+        help_text='Ключ произведения в каталоге-источнике'
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    reviews_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов',
+    )
 
     class Meta:
         ordering = ('-year', 'name',)
+        indexes = (
+            models.Index(
+                fields=('-year', 'name', 'id'),
+                name='title_year_name_id_idx'
+            ),
+            models.Index(
+                fields=('category', '-year', 'name'),
+                name='title_category_year_name_idx'
+            ),
+        )
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
     def __str__(self):
         return f'{self.name[:LEN_OF_SYMBL]}, {self.category}, {self.year}'
 
+    @property
+    def rating(self):
+        """Средняя оценка, округлённая вниз, или None без отзывов."""
+        if not self.reviews_count:
+            return None
+        return self.score_sum // self.reviews_count
+
 
 class NameAndSlugAbstract(models.Model):
     """Абстрактный класс."""
@@ -136,6 +166,9 @@ class NameAndSlugAbstract(models.Model):
     class Meta:
         abstract = True
         ordering = ('name', )
+        indexes = (
+            models.Index(fields=('name',), name='%(class)s_name_idx'),
+        )
 
     def __str__(self) -> str:
         return self.name[:LEN_OF_SYMBL]
@@ -157,15 +190,66 @@ class Category(NameAndSlugAbstract):
         verbose_name_plural = 'Категории'
 
 
+class PublicationQuerySet(models.QuerySet):
+
+    def for_title(self, title_id):
+        """Направляем запрос в шард произведения (reviews.sharding)."""
+        return self.using(get_shard(title_id))
+
+    def create(self, **kwargs):
+        if self._db is not None:
+            return super().create(**kwargs)
+        # База не выбрана: сохраняем через save(), чтобы роутер выбрал
+        # шард по самому объекту.
+        obj = self.model(**kwargs)
+        obj.save(force_insert=True)
+        return obj
+
+    def with_authors(self):
+        """Подгружаем авторов отдельным запросом по сохранённым author_id.
+
+        Пользователи могут храниться в другой базе (USERS_DATABASE),
+        где JOIN с публикациями невозможен.
+        """
+        return self.prefetch_related(author_prefetch())
+
+
+def author_prefetch():
+    return models.Prefetch(
+        'author',
+        queryset=User.objects.only('id', 'username').order_by()
+    )
+
+
+# Внешний ключ на автора создаётся в БД, только если публикации хранятся
+# в одной базе с пользователями: без отдельной базы пользователей
+# (reviews.routers) и без шардирования (reviews.sharding). Иначе
+# публикации удаляет сигнал reviews.signals.delete_publications.
+AUTHOR_DB_CONSTRAINT = (
+    settings.USERS_DATABASE == DEFAULT_DB_ALIAS
+    and not settings.REVIEW_SHARDING
+)
+
+# Отзывы в шардах (reviews.sharding) хранятся отдельно от произведений:
+# тогда внешнего ключа в БД нет, а отзывы удаляет сигнал
+# reviews.signals.delete_title_reviews.
+TITLE_DB_CONSTRAINT = not settings.REVIEW_SHARDING
+
+
 class PublicationBase(models.Model):
     text = models.TextField(verbose_name='Текст')
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
     author = models.ForeignKey(
         User,
-        on_delete=models.CASCADE,
+        on_delete=(
+            models.CASCADE if AUTHOR_DB_CONSTRAINT else models.DO_NOTHING
+        ),
+        db_constraint=AUTHOR_DB_CONSTRAINT,
         verbose_name='Автор'
     )
 
+    objects = PublicationQuerySet.as_manager()
+
     def __str__(self):
         return self.text[:LEN_OF_SYMBL]
 
@@ -185,13 +269,37 @@ class Review(PublicationBase):
     )
     title = models.ForeignKey(
         Title,
-        on_delete=models.CASCADE,
+        on_delete=(
+            models.CASCADE if TITLE_DB_CONSTRAINT else models.DO_NOTHING
+        ),
+        db_constraint=TITLE_DB_CONSTRAINT,
         verbose_name='Произведение'
     )
 
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(
+            Review, instance=self
+        )
+        with transaction.atomic(using=using):
+            # Оценку, загруженную вместе с объектом, мог изменить
+            # параллельный запрос: сумму оценок произведения корректируем
+            # на разницу с оценкой, заблокированной в этой транзакции.
+            self._loaded_score = None if self._state.adding else (
+                Review.objects.using(using).select_for_update().filter(
+                    pk=self.pk
+                ).values_list('score', flat=True).first()
+            )
+            super().save(*args, **kwargs)
+
     class Meta(PublicationBase.Meta):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date'),
+                name='review_title_pub_date_idx'
+            ),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -210,3 +318,64 @@ class Comment(PublicationBase):
     class Meta(PublicationBase.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
+
+
+class OutboxEmail(models.Model):
+    """Письмо, ожидающее отправки командой send_outbox_emails."""
+
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(
+        max_length=EMAIL_LENGTH, verbose_name='Отправитель'
+    )
+    recipient = models.EmailField(
+        max_length=EMAIL_LENGTH, verbose_name='Получатель'
+    )
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток отправки'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, verbose_name='Следующая попытка'
+    )
+    sent_at = models.DateTimeField(
+        blank=True, null=True, verbose_name='Дата отправки'
+    )
+    failed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Дата отказа',
+        help_text='Письмо не отправлено за допустимое число попыток'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    claim = models.UUIDField(
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False,
+        verbose_name='Метка захвата',
+        help_text='Обработчик очереди, который отправляет письмо'
+    )
+
+    class Meta:
+        ordering = ('next_attempt_at', 'id')
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = (
+            models.Index(
+                fields=('next_attempt_at', 'id'),
+                name='outbox_email_pending_idx',
+                condition=models.Q(
+                    sent_at__isnull=True, failed_at__isnull=True
+                )
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject[:LEN_OF_SYMBL]}'
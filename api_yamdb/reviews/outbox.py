@@ -0,0 +1,135 @@
+"""Очередь исходящих писем в базе данных.
+
+Письмо сохраняется в той же транзакции, что и данные, ради которых оно
+отправляется, а доставляет его команда send_outbox_emails. Неудачные
+попытки повторяются с экспоненциальной задержкой; после
+EMAIL_OUTBOX_MAX_ATTEMPTS письмо помечается как неотправленное
+(failed_at) и больше не выбирается. Перед отправкой письма захватываются
+обработчиком, поэтому параллельные send_outbox_emails не отправляют
+одно письмо дважды.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from reviews.models import OutboxEmail
+
+ERROR_LENGTH = 1000
+
+
+def enqueue_email(subject, body, recipient, from_email=None):
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        recipient=recipient,
+        from_email=from_email or settings.FROM_EMAIL
+    )
+
+
+def get_retry_delay(attempts):
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_RETRY_MAX_DELAY
+    ))
+
+
+def claim_pending_emails(batch_size, now):
+    """Захватывает до batch_size писем, срок попытки которых наступил.
+
+    Письма получают метку захвата одним UPDATE, условия которого база
+    проверяет атомарно, а next_attempt_at сдвигается на
+    EMAIL_OUTBOX_CLAIM_TIMEOUT: другие обработчики эти письма не выберут,
+    а письма обработчика, упавшего до сохранения результата, вернутся
+    в очередь по истечении этого срока.
+    """
+    pending = OutboxEmail.objects.filter(
+        sent_at__isnull=True,
+        failed_at__isnull=True,
+        next_attempt_at__lte=now
+    )
+    claim = uuid.uuid4()
+    claimed = pending.filter(
+        pk__in=pending.values('pk')[:batch_size]
+    ).update(
+        claim=claim,
+        next_attempt_at=timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+        )
+    )
+    if not claimed:
+        return []
+    return list(OutboxEmail.objects.filter(claim=claim))
+
+
+def send_batch(emails, connection, now):
+    """Отправляет письма пакета и возвращает (отправлено, отказов).
+
+    Результаты попыток сохраняются, даже если переподключиться к почтовому
+    серверу не удалось и исключение прервало пакет.
+    """
+    sent = failed = 0
+    processed = []
+    try:
+        for email in emails:
+            processed.append(email)
+            email.attempts += 1
+            try:
+                EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email,
+                    to=(email.recipient,),
+                    connection=connection
+                ).send()
+            except Exception as error:
+                email.last_error = repr(error)[:ERROR_LENGTH]
+                if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                    email.failed_at = now
+                    failed += 1
+                else:
+                    email.next_attempt_at = now + get_retry_delay(
+                        email.attempts
+                    )
+                # Соединение могло оборваться - открываем новое.
+                connection.close()
+                connection.open()
+            else:
+                email.sent_at = now
+                sent += 1
+    finally:
+        OutboxEmail.objects.bulk_update(processed, (
+            'attempts', 'next_attempt_at', 'sent_at', 'failed_at',
+            'last_error'
+        ))
+    return sent, failed
+
+
+def deliver_pending_emails(batch_size=None, connection=None):
+    """Отправляет все письма, срок попытки которых наступил.
+
+    Пакеты отправляются через одно открытое соединение почтового
+    бэкенда. Возвращает (отправлено, отказов, отложено).
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    connection = connection or get_connection()
+    sent = failed = retried = 0
+    now = timezone.now()
+    # Захваченные и отложенные письма получают next_attempt_at позже now,
+    # поэтому каждое письмо попадает в выборку не больше одного раза.
+    emails = claim_pending_emails(batch_size, now)
+    if not emails:
+        return sent, failed, retried
+    connection.open()
+    try:
+        while emails:
+            batch_sent, batch_failed = send_batch(emails, connection, now)
+            sent += batch_sent
+            failed += batch_failed
+            retried += len(emails) - batch_sent - batch_failed
+            emails = claim_pending_emails(batch_size, now)
+    finally:
+        connection.close()
+    return sent, failed, retried
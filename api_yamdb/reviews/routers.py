@@ -0,0 +1,61 @@
+"""Отдельная база для пользователей и служебных данных авторизации.
+
+Регистрация и выдача токенов часто пишут в таблицы пользователей;
+в SQLite запись блокирует весь файл, поэтому при USERS_DATABASE,
+отличном от default, пользователи, очередь писем и данные приложений
+auth, contenttypes, admin и sessions хранятся в своей базе, а каталог -
+в основной. Публикации тогда ссылаются на авторов по author_id без
+внешнего ключа в БД (см. reviews.models.AUTHOR_DB_CONSTRAINT); команда
+split_users_database удаляет эти ключи в исходной базе.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+USERS_APP_LABELS = ('admin', 'auth', 'contenttypes', 'sessions')
+USERS_MODELS = ('reviews.user', 'reviews.outboxemail')
+
+
+def is_users_model(model):
+    # Промежуточные модели ManyToMany хранятся вместе со своей моделью.
+    model = model._meta.auto_created or model
+    return (
+        model._meta.app_label in USERS_APP_LABELS
+        or model._meta.label_lower in USERS_MODELS
+    )
+
+
+class UsersRouter:
+    """Роутер баз данных: модели пользователей - в USERS_DATABASE.
+
+    Для остальных моделей решение оставляется следующим роутерам.
+    """
+
+    def db_for_read(self, model, **hints):
+        if is_users_model(model):
+            return settings.USERS_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        if is_users_model(model):
+            return settings.USERS_DATABASE
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Связь публикации с автором из другой базы хранится как author_id.
+        if is_users_model(obj1) or is_users_model(obj2):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # В базу пользователей (любой алиас, кроме default и реплик)
+        # мигрируются только её модели, даже если USERS_DATABASE ещё
+        # указывает на default.
+        if db == DEFAULT_DB_ALIAS or db in settings.DATABASE_REPLICAS:
+            return None
+        if 'model' in hints:
+            return is_users_model(hints['model'])
+        if app_label in USERS_APP_LABELS:
+            return True
+        if model_name is None:
+            return False
+        return f'{app_label}.{model_name}' in USERS_MODELS
@@ -0,0 +1,40 @@
+"""Создание и удаление внешних ключей в схеме БД вне миграций.
+
+Нужно командам, которые переносят данные в другие базы: после переноса
+внешний ключ в исходной базе ссылался бы на строки, которых там больше
+нет.
+"""
+import copy
+
+from django.db import connections
+
+
+def has_db_constraint(connection, field):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, field.model._meta.db_table
+        )
+    return any(
+        constraint['foreign_key'] and constraint['columns'] == [field.column]
+        for constraint in constraints.values()
+    )
+
+
+def set_db_constraints(alias, fields, db_constraint):
+    """Создаёт (db_constraint=True) или удаляет внешние ключи fields.
+
+    Поля, у которых ограничение уже в нужном состоянии, не меняются.
+    """
+    connection = connections[alias]
+    fields = [
+        field for field in fields
+        if has_db_constraint(connection, field) != db_constraint
+    ]
+    if not fields:
+        return
+    with connection.schema_editor() as schema_editor:
+        for field in fields:
+            old_field, new_field = copy.copy(field), copy.copy(field)
+            old_field.db_constraint = not db_constraint
+            new_field.db_constraint = db_constraint
+            schema_editor.alter_field(field.model, old_field, new_field)
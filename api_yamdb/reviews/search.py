@@ -0,0 +1,121 @@
+"""Полнотекстовый поиск по названию и описанию произведений.
+
+В SQLite используется внешний FTS5-индекс, который синхронизируется
+с таблицей произведений триггерами; на остальных СУБД поиск выполняется
+через icontains без ранжирования.
+"""
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from reviews.models import Title
+
+TITLE_TABLE = Title._meta.db_table
+FTS_TABLE = f'{TITLE_TABLE}_fts'
+FTS_COLUMNS = ('name', 'description')
+
+CREATE_FTS_TABLE = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    f'{", ".join(FTS_COLUMNS)}, content={TITLE_TABLE!r}, '
+    "content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+)
+FTS_TRIGGERS = tuple(f'{FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au'))
+# Триггеры удаляются вместе с таблицей; после миграций, пересоздающих
+# reviews_title, их восстанавливает restore_search_index.
+CREATE_TRIGGERS = (
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT '
+    f'ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE '
+    f'ON {TITLE_TABLE} BEGIN '
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE '
+    f'OF name, description ON {TITLE_TABLE} BEGIN '
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+)
+REBUILD_FTS_TABLE = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+)
+DROP_FTS = (
+    *(f'DROP TRIGGER IF EXISTS {trigger}' for trigger in FTS_TRIGGERS),
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def uses_fts(db_connection=connection):
+    return db_connection.vendor == 'sqlite'
+
+
+def create_search_index(schema_editor):
+    """Создаём индекс и триггеры и заполняем индекс текущими данными."""
+    if not uses_fts(schema_editor.connection):
+        return
+    for sql in (CREATE_FTS_TABLE, *CREATE_TRIGGERS, REBUILD_FTS_TABLE):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(schema_editor):
+    if not uses_fts(schema_editor.connection):
+        return
+    for sql in DROP_FTS:
+        schema_editor.execute(sql)
+
+
+def restore_search_index(sender, using, **kwargs):
+    """Обработчик post_migrate: восстанавливаем триггеры индекса.
+
+    Если миграция пересоздала таблицу произведений, триггеры удалены
+    вместе с ней, и индекс перестаёт следить за изменениями: триггеры
+    создаются заново, а индекс заполняется текущими данными.
+    """
+    db_connection = connections[using]
+    if not uses_fts(db_connection):
+        return
+    names = (FTS_TABLE, *FTS_TRIGGERS)
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT name FROM sqlite_master WHERE name IN '
+            f'({", ".join(["%s"] * len(names))})',
+            names
+        )
+        existing = {name for name, in cursor.fetchall()}
+    if FTS_TABLE not in existing or existing.issuperset(FTS_TRIGGERS):
+        return
+    with db_connection.schema_editor() as schema_editor:
+        create_search_index(schema_editor)
+
+
+def build_match_query(text):
+    """Запрос FTS5 из слов строки: все слова, каждое как префикс."""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def search_titles(queryset, text):
+    """Оставляем произведения, подходящие под запрос, лучшие - первыми."""
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not uses_fts():
+        lookup = Q()
+        for word in re.findall(r'\w+', text):
+            lookup &= Q(name__icontains=word) | Q(description__icontains=word)
+        return queryset.filter(lookup)
+    return queryset.filter(
+        id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,)
+        )
+    ).annotate(
+        search_rank=RawSQL(
+            f'SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {TITLE_TABLE}.id',
+            (match,)
+        )
+    ).order_by('search_rank', *queryset.query.order_by)
@@ -0,0 +1,126 @@
+"""Шардирование отзывов и комментариев по title_id.
+
+При REVIEW_SHARDING отзывы и комментарии хранятся в базах REVIEW_SHARDS:
+база выбирается по хешу title_id, поэтому отзывы произведения
+и комментарии к ним всегда лежат в одном шарде. Запросы в рамках одного
+произведения идут в его шард (ShardRouter по подсказкам связанных
+менеджеров или явно через PublicationQuerySet.for_title), а запросы
+по всем произведениям обходят все шарды и объединяют результат.
+Запрос к отзывам или комментариям, для которого шард не определён,
+вызывает ShardRoutingError, а не читает основную базу.
+Первичные ключи уникальны только внутри шарда: отзыв и комментарий
+однозначно определяются только вместе с title_id.
+"""
+import heapq
+import zlib
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+SHARDED_MODELS = ('reviews.review', 'reviews.comment')
+SHARD_NOT_SELECTED_ERROR = (
+    'Шард для запроса к {} не определён: при REVIEW_SHARDING выберите '
+    'его через for_title(), using() или менеджер произведения или отзыва.'
+)
+
+
+class ShardRoutingError(Exception):
+    """Запрос к шардированной модели без выбранного шарда."""
+
+
+def get_shard(title_id):
+    """Алиас шарда произведения или None, если шардирование выключено."""
+    if not settings.REVIEW_SHARDING:
+        return None
+    shards = settings.REVIEW_SHARDS
+    return shards[zlib.crc32(str(title_id).encode()) % len(shards)]
+
+
+def get_review_databases():
+    """Базы, в которых хранятся отзывы и комментарии."""
+    if not settings.REVIEW_SHARDING:
+        return (DEFAULT_DB_ALIAS,)
+    return settings.REVIEW_SHARDS
+
+
+def merge_shards(queryset, key, limit):
+    """Первые limit объектов queryset из всех шардов по убыванию key.
+
+    queryset должен быть упорядочен по убыванию того же ключа: из каждого
+    шарда читается не больше limit строк, затем они сливаются.
+    """
+    return list(islice(heapq.merge(
+        *(
+            list(queryset.using(alias)[:limit])
+            for alias in get_review_databases()
+        ),
+        key=key,
+        reverse=True
+    ), limit))
+
+
+def is_sharded_model(model):
+    return model._meta.label_lower in SHARDED_MODELS
+
+
+class ShardRouter:
+    """Роутер баз данных: отзывы и комментарии - в шард произведения.
+
+    Шард определяется по подсказке instance: произведению (title.reviews),
+    отзыву (review.comments или сохраняемый отзыв) или комментарию
+    с загруженным отзывом. Остальные запросы (без подсказки, через
+    user.reviews, комментарий без отзыва) вызывают ShardRoutingError.
+    Исключение - запись с подсказкой другой модели: так Django
+    предварительно выбирает базу при присвоении автора, а окончательно
+    база выбирается при сохранении.
+    """
+
+    def get_instance_shard(self, instance):
+        label = instance._meta.label_lower
+        if label == 'reviews.title':
+            return get_shard(instance.pk)
+        if label == 'reviews.review':
+            return get_shard(instance.title_id)
+        if label == 'reviews.comment':
+            if instance._state.db in settings.REVIEW_SHARDS:
+                return instance._state.db
+            review = instance._state.fields_cache.get('review')
+            if review is not None:
+                return get_shard(review.title_id)
+        return None
+
+    def get_shard(self, model, hints, for_write=False):
+        if not settings.REVIEW_SHARDING or not is_sharded_model(model):
+            return None
+        instance = hints.get('instance')
+        shard = None if instance is None else self.get_instance_shard(
+            instance
+        )
+        if shard is None and not (
+            for_write and instance is not None
+            and not is_sharded_model(instance)
+        ):
+            raise ShardRoutingError(
+                SHARD_NOT_SELECTED_ERROR.format(model._meta.label)
+            )
+        return shard
+
+    def db_for_read(self, model, **hints):
+        return self.get_shard(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self.get_shard(model, hints, for_write=True)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Отзывы ссылаются на произведения из основной базы по title_id.
+        if is_sharded_model(obj1) or is_sharded_model(obj2):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db not in settings.REVIEW_SHARDS:
+            return None
+        if 'model' in hints:
+            return is_sharded_model(hints['model'])
+        return f'{app_label}.{model_name}' in SHARDED_MODELS
@@ -0,0 +1,62 @@
+from django.db.models import Count, F, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Comment, Review, Title, User
+from reviews.sharding import get_review_databases
+
+
+def recalculate_rating(title_id):
+    """Пересчитываем сумму и количество оценок произведения по отзывам."""
+    totals = Review.objects.for_title(title_id).filter(
+        title_id=title_id
+    ).aggregate(
+        score_sum=Sum('score'), reviews_count=Count('id')
+    )
+    Title.objects.filter(pk=title_id).update(
+        score_sum=totals['score_sum'] or 0,
+        reviews_count=totals['reviews_count']
+    )
+
+
+@receiver(post_save, sender=Review)
+def add_review_score(sender, instance, created, **kwargs):
+    if created:
+        Title.objects.filter(pk=instance.title_id).update(
+            score_sum=F('score_sum') + instance.score,
+            reviews_count=F('reviews_count') + 1
+        )
+        return
+    # Оценка из базы, прочитанная в Review.save под блокировкой строки.
+    loaded_score = getattr(instance, '_loaded_score', None)
+    if loaded_score is None:
+        recalculate_rating(instance.title_id)
+    elif instance.score != loaded_score:
+        Title.objects.filter(pk=instance.title_id).update(
+            score_sum=F('score_sum') + instance.score - loaded_score
+        )
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_score(sender, instance, **kwargs):
+    Title.objects.filter(pk=instance.title_id).update(
+        score_sum=F('score_sum') - instance.score,
+        reviews_count=F('reviews_count') - 1
+    )
+
+
+@receiver(post_delete, sender=User)
+def delete_publications(sender, instance, **kwargs):
+    # Вместо каскадного удаления: публикации могут храниться в другой
+    # базе, чем пользователи, и в нескольких шардах. Комментарии
+    # к отзывам удалит каскад отзывов.
+    for alias in get_review_databases():
+        Review.objects.using(alias).filter(author_id=instance.id).delete()
+        Comment.objects.using(alias).filter(author_id=instance.id).delete()
+
+
+@receiver(post_delete, sender=Title)
+def delete_title_reviews(sender, instance, **kwargs):
+    Review.objects.for_title(instance.pk).filter(
+        title_id=instance.pk
+    ).delete()
@@ -0,0 +1,32 @@
+"""Настройка подключений к SQLite через PRAGMA из settings.SQLITE_PRAGMAS."""
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+PRAGMA_VALUE = re.compile(r'^-?\w+$')
+INVALID_PRAGMA_ERROR = 'Некорректное значение SQLITE_PRAGMAS[{!r}]: {!r}.'
+
+
+def get_pragma_statements(pragmas):
+    statements = []
+    for name, value in pragmas.items():
+        value = str(value)
+        if not (name.isidentifier() and PRAGMA_VALUE.match(value)):
+            raise ImproperlyConfigured(
+                INVALID_PRAGMA_ERROR.format(name, value)
+            )
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Обработчик connection_created.
+
+    PRAGMA выполняются напрямую через соединение sqlite3, поэтому
+    не попадают в connection.queries и счётчики запросов тестов.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for statement in get_pragma_statements(settings.SQLITE_PRAGMAS):
+        connection.connection.execute(statement)
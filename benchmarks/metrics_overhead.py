@@ -0,0 +1,83 @@
+"""Накладные расходы MetricsMiddleware на списке произведений.
+
+Список /api/v1/titles/ запрашивается ROUNDS раз по REQUESTS запросов
+поочерёдно с MetricsMiddleware и без него; сравниваются медианы
+времени раунда.
+
+Запуск из корня репозитория:
+    python benchmarks/metrics_overhead.py
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from reviews.models import Title  # noqa: E402
+
+METRICS_MIDDLEWARE = 'api.metrics.MetricsMiddleware'
+ROUNDS = 15
+REQUESTS = 50
+TITLES_COUNT = 200
+URL = '/api/v1/titles/'
+
+
+def make_client(with_metrics):
+    settings.MIDDLEWARE = [
+        middleware for middleware in settings.MIDDLEWARE
+        if with_metrics or middleware != METRICS_MIDDLEWARE
+    ]
+    client = Client()
+    client.get(URL)
+    return client
+
+
+def measure(client):
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        client.get(URL)
+    return time.perf_counter() - start
+
+
+def main():
+    settings.DEBUG = False
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=1900 + idx % 120)
+            for idx in range(TITLES_COUNT)
+        )
+        middleware = settings.MIDDLEWARE
+        clients = {}
+        for with_metrics in (False, True):
+            clients[with_metrics] = make_client(with_metrics)
+            settings.MIDDLEWARE = middleware
+        timings = {False: [], True: []}
+        for _ in range(ROUNDS):
+            for with_metrics, client in clients.items():
+                timings[with_metrics].append(measure(client))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    base, metrics = (
+        statistics.median(timings[key]) / REQUESTS * 1000
+        for key in (False, True)
+    )
+    print(f'без метрик: {base:.3f} мс/запрос')
+    print(f'с метриками: {metrics:.3f} мс/запрос')
+    print(f'накладные расходы: {(metrics / base - 1) * 100:.1f}%')
+
+
+if __name__ == '__main__':
+    main()
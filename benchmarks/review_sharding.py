@@ -0,0 +1,133 @@
+"""Масштабирование записи комментариев с числом шардов SQLite.
+
+PROCESSES процессов в течение DURATION секунд пишут комментарии
+к отзывам случайных произведений. Запись в SQLite блокирует файл базы
+целиком, поэтому без шардов процессы ждут друг друга, а с N шардами
+одновременно идут до N записей. Используются процессы, а не потоки,
+чтобы результат не ограничивал GIL.
+
+Каждая транзакция дополнительно держит блокировку COMMIT_LATENCY секунд:
+так моделируется медленный fsync диска сервера. Без задержки (первая
+строка COMMIT_LATENCIES) на машине с одним ядром и быстрым диском
+пропускную способность ограничивает процессор, а не блокировка файла.
+
+Запуск из корня репозитория:
+    python benchmarks/review_sharding.py
+"""
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+SHARD_COUNTS = (1, 2, 4)
+COMMIT_LATENCIES = (0, 0.01)
+PROCESSES = 16
+DURATION = 3
+TITLES_COUNT = 200
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ['REVIEW_SHARD_COUNT'] = str(max(SHARD_COUNTS))
+os.environ['REVIEW_SHARDING'] = 'true'
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import (  # noqa: E402
+    OperationalError, connections, transaction
+)
+
+from reviews.models import Comment, Review, Title, User  # noqa: E402
+
+ALL_SHARDS = settings.REVIEW_SHARDS
+
+
+def seed():
+    author = User.objects.create(username='bench', email='bench@yamdb.fake')
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=1900 + idx % 120)
+        for idx in range(TITLES_COUNT)
+    )
+    reviews = []
+    for title_id in Title.objects.values_list('id', flat=True):
+        review = Review.objects.for_title(title_id).create(
+            title_id=title_id, author=author, text='Отзыв', score=5
+        )
+        reviews.append((review.id, title_id))
+    return author.id, reviews
+
+
+def worker(author_id, reviews, latency, deadline, results):
+    connections.close_all()
+    writes = locked = 0
+    while time.monotonic() < deadline:
+        review_id, title_id = random.choice(reviews)
+        comments = Comment.objects.for_title(title_id)
+        try:
+            with transaction.atomic(using=comments.db):
+                comments.create(
+                    review_id=review_id, author_id=author_id, text='text'
+                )
+                time.sleep(latency)
+            writes += 1
+        except OperationalError:
+            locked += 1
+    results.put((writes, locked))
+
+
+def run(shard_count, latency):
+    settings.REVIEW_SHARDS = ALL_SHARDS[:shard_count]
+    old_names = {
+        alias: connections[alias].creation.create_test_db(verbosity=0)
+        for alias in ('default', *settings.REVIEW_SHARDS)
+    }
+    try:
+        author_id, reviews = seed()
+        connections.close_all()
+        results = multiprocessing.Queue()
+        deadline = time.monotonic() + DURATION
+        processes = [
+            multiprocessing.Process(
+                target=worker,
+                args=(author_id, reviews, latency, deadline, results)
+            )
+            for _ in range(PROCESSES)
+        ]
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        return (
+            sum(writes for writes, _ in totals),
+            sum(locked for _, locked in totals)
+        )
+    finally:
+        for alias, old_name in old_names.items():
+            connections[alias].creation.destroy_test_db(
+                old_name, verbosity=0
+            )
+
+
+def main():
+    multiprocessing.set_start_method('fork')
+    print(
+        f'{"задержка, мс":>12} {"шардов":>7} {"записей/с":>10} '
+        f'{"locked":>7}'
+    )
+    for latency in COMMIT_LATENCIES:
+        for shard_count in SHARD_COUNTS:
+            writes, locked = run(shard_count, latency)
+            print(
+                f'{latency * 1000:>12.0f} {shard_count:>7} '
+                f'{writes / DURATION:>10.0f} {locked:>7}'
+            )
+
+
+if __name__ == '__main__':
+    main()
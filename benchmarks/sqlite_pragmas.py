@@ -0,0 +1,123 @@
+"""Смешанная нагрузка чтения и записи на SQLite с PRAGMA и без них.
+
+Потоки в течение DURATION секунд читают страницы произведений и отзывов
+и с вероятностью WRITE_SHARE пишут комментарии и правят произведения.
+Для каждой конфигурации создаётся отдельная тестовая БД, так как
+journal_mode сохраняется в файле.
+
+Запуск из корня репозитория:
+    python benchmarks/sqlite_pragmas.py
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import OperationalError, connection, connections  # noqa: E402
+
+from reviews.models import Comment, Review, Title, User  # noqa: E402
+
+CONFIGS = (
+    ('по умолчанию', {
+        'journal_mode': 'delete',
+        'synchronous': 'full',
+        'busy_timeout': settings.SQLITE_PRAGMAS['busy_timeout'],
+    }),
+    ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS),
+)
+THREADS = 8
+DURATION = 3
+WRITE_SHARE = 0.2
+TITLES_COUNT = 200
+
+
+def seed():
+    author = User.objects.create(username='bench', email='bench@yamdb.fake')
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=1900 + idx % 120)
+        for idx in range(TITLES_COUNT)
+    )
+    Review.objects.bulk_create(
+        Review(title_id=title_id, author=author, text='Отзыв', score=5)
+        for title_id in Title.objects.values_list('id', flat=True)
+    )
+    return author.id, list(Review.objects.values_list('id', 'title_id'))
+
+
+def worker(author_id, reviews, deadline, stats, lock):
+    reads = writes = locked = 0
+    while time.monotonic() < deadline:
+        review_id, title_id = random.choice(reviews)
+        try:
+            if random.random() < WRITE_SHARE:
+                Comment.objects.create(
+                    review_id=review_id, author_id=author_id, text='text'
+                )
+                Title.objects.filter(pk=title_id).update(
+                    description=f'Описание {time.monotonic()}'
+                )
+                writes += 1
+            else:
+                list(Title.objects.order_by('-year', 'name', 'id')[:20])
+                list(Comment.objects.filter(review_id=review_id)[:20])
+                reads += 1
+        except OperationalError:
+            locked += 1
+    connections.close_all()
+    with lock:
+        stats['reads'] += reads
+        stats['writes'] += writes
+        stats['locked'] += locked
+
+
+def run(pragmas):
+    settings.SQLITE_PRAGMAS = pragmas
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        author_id, reviews = seed()
+        connections.close_all()
+        stats = {'reads': 0, 'writes': 0, 'locked': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + DURATION
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(author_id, reviews, deadline, stats, lock)
+            )
+            for _ in range(THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def main():
+    print(
+        f'{"конфигурация":>15} {"чтений/с":>10} {"записей/с":>10} '
+        f'{"locked":>7}'
+    )
+    for name, pragmas in CONFIGS:
+        stats = run(pragmas)
+        print(
+            f'{name:>15} {stats["reads"] / DURATION:>10.0f} '
+            f'{stats["writes"] / DURATION:>10.0f} {stats["locked"]:>7}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Сравнение TitleSerializer и TitleFastReadSerializer.
+
+Запуск из корня репозитория:
+    python benchmarks/title_read.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from api.serializers import (  # noqa: E402
+    TitleFastReadSerializer, TitleSerializer
+)
+from reviews.models import Category, Genre, Title  # noqa: E402
+
+PAGE_SIZES = (5, 100, 1000)
+REPEAT = 5
+
+
+def seed(titles_count):
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(10)
+    ]
+    categories = [
+        Category.objects.create(name=f'Категория {idx}', slug=f'cat-{idx}')
+        for idx in range(5)
+    ]
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {idx}',
+            year=1900 + idx % 120,
+            description='Описание ' * 20,
+            category=categories[idx % len(categories)],
+            score_sum=idx % 50,
+            reviews_count=idx % 7
+        )
+        for idx in range(titles_count)
+    )
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title_id, genre=genres[offset % 10])
+        for title_id in Title.objects.values_list('id', flat=True)
+        for offset in range(title_id % 3)
+    )
+
+
+def drf_read(page_size):
+    titles = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    ).order_by('-year', 'name', 'id')[:page_size]
+    return TitleSerializer(titles, many=True).data
+
+
+def fast_read(page_size):
+    serializer = TitleFastReadSerializer()
+    rows = list(
+        Title.objects.order_by('-year', 'name', 'id').values(
+            *serializer.get_values_fields()
+        )[:page_size]
+    )
+    return serializer.to_representation(rows)
+
+
+def main():
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(max(PAGE_SIZES))
+        print(f'{"page_size":>9} {"drf, ms":>10} {"fast, ms":>10} {"x":>6}')
+        for page_size in PAGE_SIZES:
+            assert drf_read(page_size) == fast_read(page_size)
+            drf = min(timeit.repeat(
+                lambda: drf_read(page_size), number=1, repeat=REPEAT
+            ))
+            fast = min(timeit.repeat(
+                lambda: fast_read(page_size), number=1, repeat=REPEAT
+            ))
+            print(
+                f'{page_size:>9} {drf * 1000:>10.2f} {fast * 1000:>10.2f} '
+                f'{drf / fast:>6.1f}'
+            )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Конкуренция записи каталога с регистрацией в одной и в двух базах SQLite.
+
+AUTH_THREADS потоков в течение DURATION секунд регистрируют пользователей
+(пользователь и письмо в очереди в одной транзакции), а CATALOGUE_THREADS
+потоков пишут комментарии и правят произведения. В одной базе запись
+регистрации блокирует весь файл, и запись каталога ждёт её; при
+USERS_DATABASE = 'users' базы блокируются независимо.
+
+Запуск из корня репозитория:
+    python benchmarks/users_database_split.py
+"""
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import (  # noqa: E402
+    OperationalError, connections, router, transaction
+)
+
+from reviews.models import Comment, Review, Title, User  # noqa: E402
+from reviews.outbox import enqueue_email  # noqa: E402
+
+CONFIGS = (
+    ('одна база', 'default'),
+    ('две базы', 'users'),
+)
+AUTH_THREADS = 4
+CATALOGUE_THREADS = 4
+DURATION = 3
+TITLES_COUNT = 200
+
+
+def seed():
+    author = User.objects.create(username='bench', email='bench@yamdb.fake')
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=1900 + idx % 120)
+        for idx in range(TITLES_COUNT)
+    )
+    Review.objects.bulk_create(
+        Review(title_id=title_id, author=author, text='Отзыв', score=5)
+        for title_id in Title.objects.values_list('id', flat=True)
+    )
+    return author.id, list(Review.objects.values_list('id', 'title_id'))
+
+
+def signup(idx):
+    with transaction.atomic(using=router.db_for_write(User)):
+        user = User.objects.create(
+            username=f'user{idx}', email=f'user{idx}@yamdb.fake'
+        )
+        enqueue_email(
+            subject='Код подтверждения', body='12345', recipient=user.email
+        )
+
+
+def write_catalogue(author_id, reviews):
+    review_id, title_id = random.choice(reviews)
+    Comment.objects.create(
+        review_id=review_id, author_id=author_id, text='text'
+    )
+    Title.objects.filter(pk=title_id).update(
+        description=f'Описание {time.monotonic()}'
+    )
+
+
+def worker(operation, deadline, stats, key, lock):
+    done = locked = 0
+    while time.monotonic() < deadline:
+        try:
+            operation()
+            done += 1
+        except OperationalError:
+            locked += 1
+    connections.close_all()
+    with lock:
+        stats[key] += done
+        stats['locked'] += locked
+
+
+def run(users_database):
+    settings.USERS_DATABASE = users_database
+    aliases = sorted({'default', users_database})
+    old_names = {
+        alias: connections[alias].creation.create_test_db(verbosity=0)
+        for alias in aliases
+    }
+    try:
+        author_id, reviews = seed()
+        connections.close_all()
+        stats = {'signups': 0, 'catalogue': 0, 'locked': 0}
+        lock = threading.Lock()
+        counter = itertools.count()
+        deadline = time.monotonic() + DURATION
+        threads = [
+            threading.Thread(target=worker, args=(
+                lambda: signup(next(counter)),
+                deadline, stats, 'signups', lock
+            ))
+            for _ in range(AUTH_THREADS)
+        ] + [
+            threading.Thread(target=worker, args=(
+                lambda: write_catalogue(author_id, reviews),
+                deadline, stats, 'catalogue', lock
+            ))
+            for _ in range(CATALOGUE_THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
+    finally:
+        for alias, old_name in old_names.items():
+            connections[alias].creation.destroy_test_db(
+                old_name, verbosity=0
+            )
+
+
+def main():
+    print(
+        f'{"конфигурация":>12} {"регистраций/с":>14} '
+        f'{"записей каталога/с":>19} {"locked":>7}'
+    )
+    for name, users_database in CONFIGS:
+        stats = run(users_database)
+        print(
+            f'{name:>12} {stats["signups"] / DURATION:>14.0f} '
+            f'{stats["catalogue"] / DURATION:>19.0f} {stats["locked"]:>7}'
+        )
+
+
+if __name__ == '__main__':
+    main()
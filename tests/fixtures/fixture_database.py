@@ -0,0 +1,62 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+from django.db import connections, models
+
+from reviews.models import Comment, Review
+from reviews.schema import set_db_constraints
+
+
+@pytest.fixture
+def file_database(tmp_path):
+    """Основная тестовая база в файле на время теста.
+
+    Тестовая база SQLite хранится в общей памяти: там параллельные
+    запросы получают "database table is locked" вместо ожидания
+    блокировки, а WAL и mmap недоступны. Фикстура копирует базу в файл
+    и направляет в него подключения всех потоков.
+    """
+    connection = connections['default']
+    connection.ensure_connection()
+    path = str(tmp_path / 'test_db.sqlite3')
+    with closing(sqlite3.connect(path)) as target:
+        connection.connection.backup(target)
+    memory_connection = connection.connection
+    memory_name = connection.settings_dict['NAME']
+    # settings_dict общий для подключений всех потоков.
+    connection.connection = None
+    connection.settings_dict['NAME'] = path
+    try:
+        yield path
+    finally:
+        connection.close()
+        connection.settings_dict['NAME'] = memory_name
+        connection.connection = memory_connection
+
+
+@pytest.fixture
+def separate_publication_databases(monkeypatch):
+    """Внешние ключи публикаций как при отдельных базах на время теста.
+
+    Внешние ключи зависят от настроек при импорте моделей, а тесты
+    включают отдельную базу пользователей и шардирование через settings.
+    На время теста ключи удаляются из основной базы, а каскадное
+    удаление заменяется DO_NOTHING; после теста публикации основной базы
+    удаляются, и ключи восстанавливаются.
+    """
+    fields = (
+        Review._meta.get_field('title'),
+        Review._meta.get_field('author'),
+        Comment._meta.get_field('author')
+    )
+    for field in fields:
+        monkeypatch.setattr(
+            field.remote_field, 'on_delete', models.DO_NOTHING
+        )
+    set_db_constraints('default', fields, db_constraint=False)
+    yield
+    for model in (Comment, Review):
+        model._base_manager.using('default').all()._raw_delete('default')
+    for field in fields:
+        set_db_constraints('default', (field,), field.db_constraint)
@@ -2,6 +2,35 @@ import pytest
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import AccessToken
 
+from api.authentication import user_cache
+from api.throttling import local_buckets
+
+
+@pytest.fixture(autouse=True)
+def isolated_shared_cache(settings, tmp_path):
+    """Общий кеш процессов в отдельном каталоге для каждого теста."""
+    settings.CACHES = {
+        **settings.CACHES,
+        'shared': {
+            **settings.CACHES['shared'],
+            'LOCATION': str(tmp_path / 'shared_cache'),
+        },
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_throttle_buckets():
+    local_buckets.clear()
+    yield
+    local_buckets.clear()
+
 
 @pytest.fixture
 def user_superuser(django_user_model):
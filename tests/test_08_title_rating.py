@@ -0,0 +1,189 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+
+from reviews.models import Comment, Review, Title, User
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при создании отзыва.'
+        )
+
+        user_review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=reviews[1]['id']
+        )
+        response = user_client.patch(user_review_url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при изменении оценки отзыва.'
+        )
+
+        response = user_client.patch(user_review_url, data={'text': 'new'})
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что изменение текста отзыва не меняет рейтинг.'
+        )
+
+        response = user_client.delete(user_review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при удалении отзыва.'
+        )
+        assert self.get_rating(admin_client, titles[1]['id']) is None
+
+    def test_02_rating_after_author_cascade_delete(self, admin_client, admin,
+                                                   user_client, user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        create_single_review(user_client, titles[1]['id'], 'text', 2)
+        user.delete()
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.reviews_count) == (5, 1), (
+            'Проверьте, что при удалении пользователя рейтинг '
+            'произведений пересчитывается.'
+        )
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert (title.score_sum, title.reviews_count) == (0, 0)
+        assert title.rating is None
+
+    def test_03_rebuild_title_ratings_command(self, admin_client, admin,
+                                              user_client, user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Review.objects.filter(author=user).update(score=1)
+        Title.objects.update(score_sum=0, reviews_count=0)
+
+        call_command('rebuild_title_ratings')
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.reviews_count) == (6, 2), (
+            'Проверьте, что команда `rebuild_title_ratings` пересчитывает '
+            'сохранённые суммы и количество оценок.'
+        )
+        assert title.rating == 3
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert (title.score_sum, title.reviews_count) == (0, 0)
+
+    def test_04_rating_with_stale_review_instances(self, admin_client, admin,
+                                                   user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        first = Review.objects.get(pk=reviews[1]['id'])
+        second = Review.objects.get(pk=reviews[1]['id'])
+        first.score = 10
+        first.save()
+        second.score = 2
+        second.save()
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.reviews_count) == (
+            Review.objects.get(pk=reviews[0]['id']).score + 2, 2
+        ), (
+            'Проверьте, что сумма оценок произведения корректируется '
+            'на разницу с оценкой из базы, а не с загруженной ранее.'
+        )
+
+    def test_05_author_foreign_key_in_shared_database(self, admin_client,
+                                                      admin, user_client,
+                                                      user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Comment.objects.create(
+            review_id=reviews[0]['id'], author=user, text='text'
+        )
+        User.objects.filter(pk=user.pk).delete()
+        assert not Review.objects.filter(author_id=user.pk).exists(), (
+            'Проверьте, что при удалении пользователей через QuerySet '
+            'их отзывы удаляются каскадно.'
+        )
+        assert not Comment.objects.exists()
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.reviews_count) == (
+            Review.objects.get().score, 1
+        )
+
+        with pytest.raises(IntegrityError), connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {User._meta.db_table} WHERE id = %s',
+                [admin.pk]
+            )
+
+    def test_06_title_foreign_key_in_shared_database(self, admin_client,
+                                                     admin, user_client,
+                                                     user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Comment.objects.create(
+            review_id=reviews[0]['id'], author=user, text='text'
+        )
+        Title.objects.filter(pk=titles[0]['id']).delete()
+        assert not Review.objects.exists(), (
+            'Проверьте, что при удалении произведений через QuerySet '
+            'их отзывы удаляются каскадно.'
+        )
+        assert not Comment.objects.exists()
+
+        create_single_review(user_client, titles[1]['id'], 'text', 2)
+        with pytest.raises(IntegrityError), connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {Title._meta.db_table} WHERE id = %s',
+                [titles[1]['id']]
+            )
+
+    def test_07_admin_search_by_author(self, client, admin_client, admin,
+                                       user_client, user):
+        reviews, _ = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Comment.objects.create(
+            review_id=reviews[0]['id'], author=user, text='text'
+        )
+        superuser = User.objects.create_superuser(
+            username='superuser', email='superuser@yamdb.fake',
+            password='1234567'
+        )
+        client.force_login(superuser)
+        for model in ('review', 'comment'):
+            url = f'/admin/reviews/{model}/'
+            response = client.get(url, {'q': user.username})
+            assert response.status_code == HTTPStatus.OK
+            assert response.context['cl'].result_count == 1, (
+                'Проверьте, что в админке работает поиск публикаций '
+                'по автору.'
+            )
+            response = client.get(url, {'author__username': user.username})
+            assert response.status_code == HTTPStatus.OK
+            assert response.context['cl'].result_count == 1
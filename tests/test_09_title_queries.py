@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Genre, Title
+
+# Бюджеты запросов к БД для эндпоинтов произведений.
+LIST_QUERIES = 3
+DETAIL_QUERIES = 2
+CREATE_QUERIES = 9
+UPDATE_QUERIES = 10
+
+
+def create_catalogue(titles_count):
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(3)
+    ]
+    category = Category.objects.create(name='Фильм', slug='films')
+    for idx in range(titles_count):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        title.genre.set(genres)
+    return genres, category
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    @pytest.mark.parametrize('titles_count', (1, 20))
+    def test_01_list(self, client, django_assert_max_num_queries,
+                     titles_count):
+        create_catalogue(titles_count)
+        with django_assert_max_num_queries(LIST_QUERIES):
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'][0]['genre'], (
+            f'Проверьте, что ответ на GET-запрос к `{self.TITLES_URL}` '
+            'содержит жанры произведений.'
+        )
+
+    def test_02_detail(self, client, django_assert_max_num_queries):
+        create_catalogue(1)
+        title = Title.objects.get()
+        with django_assert_max_num_queries(DETAIL_QUERIES):
+            response = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['category']['slug'] == 'films'
+
+    def test_03_create_and_update(self, admin_client,
+                                  django_assert_max_num_queries):
+        genres, category = create_catalogue(0)
+        data = {
+            'name': 'Новое произведение',
+            'year': 2000,
+            'genre': [genres[0].slug, genres[1].slug],
+            'category': category.slug,
+        }
+        with django_assert_max_num_queries(CREATE_QUERIES):
+            response = admin_client.post(self.TITLES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(response.json()['genre']) == 2
+
+        with django_assert_max_num_queries(UPDATE_QUERIES):
+            response = admin_client.patch(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(
+                    title_id=response.json()['id']
+                ),
+                data={'genre': [genres[2].slug], 'name': 'Другое название'}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['genre'] == [
+            {'name': genres[2].name, 'slug': genres[2].slug}
+        ]
@@ -0,0 +1,92 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Genre, Title
+
+
+def create_titles_with_ties():
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    category = Category.objects.create(name='Фильм', slug='films')
+    titles = []
+    for idx in range(13):
+        title = Title.objects.create(
+            name=f'Произведение {idx % 3}',
+            year=1990 + idx % 4,
+            category=category
+        )
+        if idx % 2:
+            title.genre.add(drama)
+        titles.append(title)
+    return sorted(titles, key=lambda title: (-title.year, title.name, title.id))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleCursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def walk(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсора не выполняется подсчёт '
+                'общего количества объектов.'
+            )
+            ids.extend(title['id'] for title in data['results'])
+            url = data['next']
+        return ids
+
+    def test_01_cursor_walks_whole_catalogue(self, client):
+        titles = create_titles_with_ties()
+        ids = self.walk(client, f'{self.TITLES_URL}?cursor=')
+        assert ids == [title.id for title in titles], (
+            f'Проверьте, что при обходе `{self.TITLES_URL}` по курсору '
+            'произведения возвращаются в порядке (-year, name, id) '
+            'без пропусков и повторов.'
+        )
+
+    def test_02_cursor_with_filter(self, client):
+        titles = create_titles_with_ties()
+        ids = self.walk(client, f'{self.TITLES_URL}?genre=drama&cursor=')
+        assert ids == [
+            title.id for title in titles
+            if title.genre.filter(slug='drama').exists()
+        ], (
+            'Проверьте, что режим курсора совместим с фильтрами '
+            f'`{self.TITLES_URL}`.'
+        )
+
+    def test_03_page_number_mode_unchanged(self, client):
+        create_titles_with_ties()
+        data = client.get(self.TITLES_URL).json()
+        assert data['count'] == 13
+        assert 'previous' in data
+
+    def test_04_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=not-a-cursor')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('position', (
+        'not-a-list',
+        [2000, 'name'],
+        ['year', 'name', 1],
+        [{'year': 2000}, 'name', 1],
+        [2000, 'name', 2 ** 70],
+        [1e400, 'name', 1],
+    ))
+    def test_05_malformed_cursor_position(self, client, position):
+        create_titles_with_ties()
+        cursor = base64.urlsafe_b64encode(json.dumps(position).encode())
+        response = client.get(
+            f'{self.TITLES_URL}?cursor={cursor.decode()}'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что курсор с некорректной позицией возвращает '
+            'ошибку 404, а не ошибку сервера.'
+        )
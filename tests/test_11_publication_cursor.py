@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from urllib.parse import quote
+
+import pytest
+
+from reviews.models import Comment, Review, Title
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def create_reviews_with_ties(django_user_model):
+    title = Title.objects.create(name='Произведение', year=2000)
+    other_title = Title.objects.create(name='Другое', year=2000)
+    reviews = []
+    for idx in range(12):
+        author = django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            title=title, author=author, text=f'review {idx}', score=5
+        )
+        Review.objects.create(
+            title=other_title, author=author, text='other', score=5
+        )
+        Comment.objects.create(
+            review=review, author=author, text=f'comment {idx}'
+        )
+        reviews.append(review)
+    for idx, review in enumerate(reviews):
+        Review.objects.filter(pk=review.pk).update(
+            pub_date=START + timedelta(hours=idx // 3)
+        )
+    return title, Review.objects.filter(title=title).order_by(
+        '-pub_date', '-id'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11PublicationCursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def walk(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        return ids
+
+    def test_01_reviews_cursor(self, client, django_user_model):
+        title, reviews = create_reviews_with_ties(django_user_model)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        assert self.walk(client, f'{url}?cursor=') == [
+            review.id for review in reviews
+        ], (
+            f'Проверьте, что при обходе `{self.REVIEWS_URL_TEMPLATE}` по '
+            'курсору отзывы возвращаются от новых к старым без пропусков '
+            'и повторов.'
+        )
+
+    def test_02_comments_cursor(self, client, django_user_model):
+        title, reviews = create_reviews_with_ties(django_user_model)
+        review = reviews[0]
+        for idx in range(7):
+            Comment.objects.create(
+                review=review, author=review.author, text=f'more {idx}'
+            )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        )
+        assert self.walk(client, f'{url}?cursor=') == list(
+            review.comments.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+
+    def test_03_reviews_since(self, client, django_user_model):
+        title, reviews = create_reviews_with_ties(django_user_model)
+        since = quote((START + timedelta(hours=2)).isoformat())
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        ids = self.walk(client, f'{url}?since={since}&cursor=')
+        assert ids == [
+            review.id for review in reviews
+            if review.pub_date > START + timedelta(hours=2)
+        ], (
+            f'Проверьте, что параметр `since` у `{self.REVIEWS_URL_TEMPLATE}` '
+            'возвращает только отзывы, опубликованные позже переданного '
+            'момента.'
+        )
+        response = client.get(f'{url}?since=вчера')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Genre, Title
+
+
+def has_count_query(context):
+    return any('COUNT(' in query['sql'] for query in context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12PaginationCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_01_count_false(self, client):
+        for idx in range(7):
+            Title.objects.create(name=f'Произведение {idx}', year=2000)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{self.TITLES_URL}?count=false')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert not has_count_query(context), (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметром '
+            '`count=false` не выполняет COUNT(*).'
+        )
+        assert data['count'] is None
+        assert data['previous'] is None
+        assert len(data['results']) == 5
+        assert 'page=2' in data['next']
+
+        data = client.get(data['next']).json()
+        assert len(data['results']) == 2
+        assert data['next'] is None
+        assert data['previous'].endswith('count=false')
+
+        response = client.get(f'{self.TITLES_URL}?count=false&page=3')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_cached_count(self, client, settings):
+        settings.PAGINATION_COUNT_CACHE_TIMEOUT = 60
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+
+        assert client.get(self.GENRES_URL).json()['count'] == 2
+        Genre.objects.create(name='Ужасы', slug='horror')
+        with CaptureQueriesContext(connection) as context:
+            data = client.get(f'{self.GENRES_URL}?page=1').json()
+        assert not has_count_query(context), (
+            'Проверьте, что при включённом кешировании количество объектов '
+            'берётся из кеша.'
+        )
+        assert data['count'] == 2
+
+        data = client.get(f'{self.GENRES_URL}?search=Ужас').json()
+        assert data['count'] == 1, (
+            'Проверьте, что количество кешируется отдельно для каждого '
+            'набора фильтров.'
+        )
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_title_fields(self, client, admin_client):
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                f'{self.TITLES_URL}?fields=id,name,year,rating'
+            )
+        assert response.status_code == HTTPStatus.OK
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'year', 'rating'}, (
+                f'Проверьте, что параметр `fields` у `{self.TITLES_URL}` '
+                'оставляет в ответе только перечисленные поля.'
+            )
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'description' not in sql, (
+            'Проверьте, что поля, которых нет в ответе, не загружаются '
+            'из БД.'
+        )
+        assert 'reviews_genre' not in sql
+        assert 'reviews_category' not in sql
+
+    def test_02_title_omit(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+            + '?omit=description,genre'
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert set(data) == {'id', 'name', 'year', 'rating', 'category'}
+        assert data['category']['slug'] == titles[0]['category']
+
+    def test_03_review_and_comment_fields(self, client, admin_client, admin,
+                                          user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+            + '?fields=id,author'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert {
+            review['author'] for review in response.json()['results']
+        } == {admin.username, user.username}
+        assert set(response.json()['results'][0]) == {'id', 'author'}
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                self.COMMENTS_URL_TEMPLATE.format(
+                    title_id=titles[0]['id'], review_id=reviews[0]['id']
+                ) + '?omit=author'
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.json()['results'][0]) == {'id', 'text', 'pub_date'}
+        assert 'reviews_user' not in context.captured_queries[-1]['sql']
+
+    def test_04_user_fields(self, admin_client, admin):
+        response = admin_client.get(f'{self.USERS_URL}?fields=username,role')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [
+            {'username': admin.username, 'role': admin.role}
+        ]
+
+    def test_05_write_ignores_fields(self, admin_client):
+        response = admin_client.post(
+            f'{self.USERS_URL}?fields=username',
+            data={'username': 'newuser', 'email': 'newuser@yamdb.fake'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['email'] == 'newuser@yamdb.fake'
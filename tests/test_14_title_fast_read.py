@@ -0,0 +1,67 @@
+import pytest
+
+from reviews.models import Category, Genre, Review, Title
+
+
+def create_mixed_catalogue(django_user_model):
+    genres = [
+        Genre.objects.create(name=name, slug=slug)
+        for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'))
+    ]
+    category = Category.objects.create(name='Фильм', slug='films')
+    author = django_user_model.objects.create_user(
+        username='author', email='author@yamdb.fake'
+    )
+    for idx in range(8):
+        title = Title.objects.create(
+            name=f'Произведение «{idx}»',
+            year=1990 + idx % 3,
+            description=None if idx % 2 else f'Описание {idx}',
+            category=None if idx % 3 == 0 else category
+        )
+        title.genre.set(genres[:idx % 3])
+        if idx % 4:
+            Review.objects.create(
+                title=title, author=author, text='text', score=idx
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleFastRead:
+
+    URLS = (
+        '/api/v1/titles/',
+        '/api/v1/titles/?page=2',
+        '/api/v1/titles/?cursor=',
+        '/api/v1/titles/?count=false&genre=drama',
+        '/api/v1/titles/?fields=id,rating,genre',
+        '/api/v1/titles/?omit=category',
+    )
+
+    def get_contents(self, client, settings, urls):
+        settings.TITLE_FAST_READ = False
+        expected = [client.get(url).content for url in urls]
+        settings.TITLE_FAST_READ = True
+        return expected, [client.get(url).content for url in urls]
+
+    def test_01_list_matches_serializer(self, client, settings,
+                                        django_user_model):
+        create_mixed_catalogue(django_user_model)
+        expected, fast = self.get_contents(client, settings, self.URLS)
+        for url, expected_content, fast_content in zip(
+            self.URLS, expected, fast
+        ):
+            assert fast_content == expected_content, (
+                f'Проверьте, что быстрый ответ на GET-запрос к `{url}` '
+                'совпадает с ответом TitleSerializer.'
+            )
+
+    def test_02_detail_matches_serializer(self, client, settings,
+                                          django_user_model):
+        create_mixed_catalogue(django_user_model)
+        urls = [
+            f'/api/v1/titles/{title_id}/'
+            for title_id in Title.objects.values_list('id', flat=True)
+        ] + ['/api/v1/titles/0/', '/api/v1/titles/abc/']
+        expected, fast = self.get_contents(client, settings, urls)
+        assert fast == expected
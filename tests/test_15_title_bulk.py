@@ -0,0 +1,164 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Genre, Title
+
+BULK_ITEMS = 50
+
+
+def create_genres_and_categories():
+    for slug in ('drama', 'comedy', 'horror'):
+        Genre.objects.create(name=slug.title(), slug=slug)
+    for slug in ('films', 'books'):
+        Category.objects.create(name=slug.title(), slug=slug)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleBulk:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+
+    def test_01_bulk_permissions(self, client, user_client, moderator_client):
+        for api_client, expected_status in (
+            (client, HTTPStatus.UNAUTHORIZED),
+            (user_client, HTTPStatus.FORBIDDEN),
+            (moderator_client, HTTPStatus.FORBIDDEN),
+        ):
+            response = api_client.post(
+                self.BULK_URL, data='[]', content_type='application/json'
+            )
+            assert response.status_code == expected_status, (
+                f'Проверьте, что POST-запрос к `{self.BULK_URL}` доступен '
+                'только администратору.'
+            )
+
+    def test_02_bulk_create_and_upsert(self, admin_client,
+                                       django_assert_max_num_queries):
+        create_genres_and_categories()
+        items = [
+            {
+                'external_id': f'ext-{idx}',
+                'name': f'Произведение {idx}',
+                'year': 1990 + idx % 10,
+                'genre': ['drama', 'comedy'][:idx % 3],
+                'category': 'films' if idx % 2 else 'books',
+            }
+            for idx in range(BULK_ITEMS)
+        ]
+        with django_assert_max_num_queries(12):
+            response = admin_client.post(
+                self.BULK_URL, data=items, format='json'
+            )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (data['created'], data['updated'], data['errors']) == (
+            BULK_ITEMS, 0, 0
+        ), (
+            f'Проверьте, что POST-запрос администратора к `{self.BULK_URL}` '
+            'создаёт все переданные произведения.'
+        )
+        assert Title.objects.count() == BULK_ITEMS
+        title = Title.objects.get(external_id='ext-2')
+        assert [genre.slug for genre in title.genre.all()] == [
+            'comedy', 'drama'
+        ]
+
+        upsert = [
+            {
+                'external_id': 'ext-2',
+                'name': 'Новое название',
+                'year': 2000,
+                'genre': ['horror'],
+            },
+            {'external_id': 'new', 'name': 'Новое', 'year': 2001,
+             'genre': ['drama'], 'category': 'books'},
+        ]
+        response = admin_client.post(
+            self.BULK_URL,
+            data='\n'.join(json.dumps(item) for item in upsert),
+            content_type='application/x-ndjson'
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [result['status'] for result in data['results']] == [
+            'updated', 'created'
+        ]
+        title.refresh_from_db()
+        assert (title.name, title.year, title.category) == (
+            'Новое название', 2000, None
+        )
+        assert [genre.slug for genre in title.genre.all()] == ['horror']
+        assert Title.objects.count() == BULK_ITEMS + 1
+
+    def test_03_bulk_item_errors(self, admin_client):
+        create_genres_and_categories()
+        items = [
+            {'external_id': 'ok', 'name': 'Ок', 'year': 2000},
+            {'external_id': 'bad-year', 'name': 'Год', 'year': 3000},
+            {'external_id': 'bad-genre', 'name': 'Жанр', 'year': 2000,
+             'genre': ['unknown']},
+            {'external_id': 'ok', 'name': 'Дубль', 'year': 2000},
+            'not an object',
+        ]
+        response = admin_client.post(self.BULK_URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (data['created'], data['errors']) == (1, 4), (
+            'Проверьте, что ошибки в отдельных элементах пакета не '
+            'отменяют сохранение остальных.'
+        )
+        assert [result['index'] for result in data['results']] == list(
+            range(len(items))
+        )
+        assert 'year' in data['results'][1]['errors']
+        assert 'genre' in data['results'][2]['errors']
+        assert 'external_id' in data['results'][3]['errors']
+        assert list(Title.objects.values_list('external_id', flat=True)) == [
+            'ok'
+        ]
+
+        response = admin_client.post(
+            self.BULK_URL, data={'name': 'x'}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_bulk_concurrent_create(self, admin_client, monkeypatch):
+        create_genres_and_categories()
+        # Произведение создал параллельный пакет уже после того, как этот
+        # пакет прочитал существующие произведения.
+        title = Title.objects.create(
+            external_id='race', name='Параллельное', year=1999
+        )
+        in_bulk = Title.objects.in_bulk
+        calls = []
+
+        def stale_in_bulk(*args, **kwargs):
+            calls.append(args)
+            return {} if len(calls) == 1 else in_bulk(*args, **kwargs)
+
+        monkeypatch.setattr(Title.objects, 'in_bulk', stale_in_bulk)
+        items = [{'external_id': 'race', 'name': 'Пакет', 'year': 2000,
+                  'genre': ['drama']}]
+        response = admin_client.post(self.BULK_URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что конфликт external_id с параллельным пакетом '
+            'не приводит к ошибке сервера.'
+        )
+        assert response.json()['results'] == [
+            {'index': 0, 'id': title.id, 'status': 'updated'}
+        ]
+        title.refresh_from_db()
+        assert (title.name, title.year) == ('Пакет', 2000)
+        assert [genre.slug for genre in title.genre.all()] == ['drama']
+
+    def test_05_external_id_is_not_filterable(self, client):
+        Title.objects.create(external_id='hidden', name='Первое', year=2000)
+        Title.objects.create(name='Второе', year=2000)
+        response = client.get('/api/v1/titles/?external_id=hidden')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 2, (
+            'Проверьте, что произведения нельзя фильтровать '
+            'по external_id.'
+        )
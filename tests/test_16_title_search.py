@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.models import Category, Genre, Title
+from reviews.search import FTS_TABLE, FTS_TRIGGERS
+
+
+def create_searchable_titles():
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    films = Category.objects.create(name='Фильм', slug='films')
+    books = Category.objects.create(name='Книга', slug='books')
+    titles = {
+        'war': Title.objects.create(
+            name='Война и мир', year=1869, category=books,
+            description='Роман о войне 1812 года'
+        ),
+        'war_film': Title.objects.create(
+            name='Война и мир', year=1966, category=films,
+            description='Экранизация романа'
+        ),
+        'peace': Title.objects.create(
+            name='Мир', year=2000, category=films,
+            description='Про войну, войну и ещё раз войну'
+        ),
+        'other': Title.objects.create(
+            name='Другое', year=2001, category=films, description=None
+        ),
+    }
+    titles['war_film'].genre.add(drama)
+    titles['peace'].genre.add(drama)
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(f'{self.TITLES_URL}?{query}')
+        assert response.status_code == HTTPStatus.OK
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_search_ranked(self, client):
+        titles = create_searchable_titles()
+        ids = self.search(client, 'search=войн')
+        assert set(ids) == {
+            titles['war'].id, titles['war_film'].id, titles['peace'].id
+        }, (
+            f'Проверьте, что параметр `search` у `{self.TITLES_URL}` ищет '
+            'по названию и описанию произведения.'
+        )
+        assert ids[0] == titles['peace'].id, (
+            'Проверьте, что результаты поиска упорядочены по релевантности.'
+        )
+        assert self.search(client, 'search=экранизация РОМАНА') == [
+            titles['war_film'].id
+        ]
+        assert self.search(client, 'search="*)') == []
+
+    def test_02_search_with_filters(self, client):
+        titles = create_searchable_titles()
+        assert set(self.search(client, 'search=войн&category=films')) == {
+            titles['war_film'].id, titles['peace'].id
+        }
+        assert set(self.search(client, 'search=мир&genre=drama')) == {
+            titles['war_film'].id, titles['peace'].id
+        }
+        assert self.search(client, 'search=мир&count=false&fields=id')
+
+    def test_03_index_follows_changes(self, client):
+        titles = create_searchable_titles()
+        Title.objects.filter(pk=titles['other'].pk).update(name='Снег')
+        assert self.search(client, 'search=снег') == [titles['other'].id]
+        titles['war'].delete()
+        assert titles['war'].id not in self.search(client, 'search=война')
+
+    def test_04_rebuild_command(self, client):
+        titles = create_searchable_titles()
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) "
+                           "VALUES ('delete-all')")
+        assert self.search(client, 'search=мир') == []
+        call_command('rebuild_title_search')
+        assert titles['peace'].id in self.search(client, 'search=мир')
+
+    def test_05_search_rejects_cursor(self, client):
+        create_searchable_titles()
+        response = client.get(f'{self.TITLES_URL}?search=мир&cursor=')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что поиск нельзя сочетать с пагинацией курсором: '
+            'курсор отбрасывает упорядочивание по релевантности.'
+        )
+        assert 'search' in response.json()
+
+    def test_06_migrate_restores_triggers(self, client):
+        titles = create_searchable_titles()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {FTS_TRIGGERS[0]}')
+        call_command('migrate', verbosity=0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' "
+                f"AND name LIKE '{FTS_TABLE}_%'"
+            )
+            assert cursor.fetchone()[0] == len(FTS_TRIGGERS), (
+                'Проверьте, что после миграций триггеры полнотекстового '
+                'индекса восстанавливаются.'
+            )
+        title = Title.objects.create(name='Снег', year=2002)
+        assert self.search(client, 'search=снег') == [title.id]
+        assert titles['peace'].id in self.search(client, 'search=мир')
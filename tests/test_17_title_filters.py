@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+def create_titles_with_genres():
+    genres = {
+        slug: Genre.objects.create(name=slug.title(), slug=slug)
+        for slug in ('drama', 'comedy', 'horror')
+    }
+    categories = {
+        slug: Category.objects.create(name=slug.title(), slug=slug)
+        for slug in ('films', 'books', 'music')
+    }
+    titles = {}
+    for name, category, title_genres in (
+        ('drama-comedy', 'films', ('drama', 'comedy')),
+        ('drama', 'books', ('drama',)),
+        ('comedy', 'music', ('comedy',)),
+        ('horror', 'films', ('horror',)),
+        ('none', 'books', ()),
+    ):
+        titles[name] = Title.objects.create(
+            name=name, year=2000, category=categories[category]
+        )
+        titles[name].genre.set(genres[slug] for slug in title_genres)
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_names(self, client, query):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{self.TITLES_URL}?{query}')
+        assert response.status_code == HTTPStatus.OK
+        for captured in context.captured_queries:
+            assert 'DISTINCT' not in captured['sql']
+        data = response.json()
+        names = [title['name'] for title in data['results']]
+        assert len(names) == len(set(names)) == data['count'], (
+            f'Проверьте, что фильтры `{self.TITLES_URL}` не дублируют '
+            'произведения.'
+        )
+        return set(names)
+
+    def test_01_single_values(self, client):
+        create_titles_with_genres()
+        assert self.get_names(client, 'genre=drama') == {
+            'drama-comedy', 'drama'
+        }
+        assert self.get_names(client, 'category=films') == {
+            'drama-comedy', 'horror'
+        }
+        assert self.get_names(client, 'genre=unknown') == set()
+
+    def test_02_genre_any_and_all(self, client):
+        create_titles_with_genres()
+        assert self.get_names(client, 'genre=drama,comedy') == {
+            'drama-comedy', 'drama', 'comedy'
+        }, (
+            f'Проверьте, что `{self.TITLES_URL}?genre=a,b` возвращает '
+            'произведения хотя бы с одним из жанров.'
+        )
+        assert self.get_names(
+            client, 'genre=drama,comedy&genre_mode=any'
+        ) == {'drama-comedy', 'drama', 'comedy'}
+        assert self.get_names(
+            client, 'genre=drama,comedy&genre_mode=all'
+        ) == {'drama-comedy'}, (
+            f'Проверьте, что `{self.TITLES_URL}?genre=a,b&genre_mode=all` '
+            'возвращает произведения со всеми жанрами.'
+        )
+        response = client.get(f'{self.TITLES_URL}?genre=drama&genre_mode=x')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_multiple_categories(self, client):
+        create_titles_with_genres()
+        assert self.get_names(client, 'category=books,music') == {
+            'drama', 'comedy', 'none'
+        }
+        assert self.get_names(
+            client, 'category=films,books&genre=drama,horror'
+        ) == {'drama-comedy', 'drama', 'horror'}
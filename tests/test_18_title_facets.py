@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from reviews.models import Category, Genre, Title
+
+
+def create_catalogue():
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    films = Category.objects.create(name='Фильм', slug='films')
+    books = Category.objects.create(name='Книга', slug='books')
+    for name, year, category, genres in (
+        ('Первое', 1984, films, (drama, comedy)),
+        ('Второе', 1988, films, (drama,)),
+        ('Третье', 1995, books, (comedy,)),
+        ('Четвёртое', 2001, None, ()),
+    ):
+        title = Title.objects.create(name=name, year=year, category=category)
+        title.genre.set(genres)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleFacets:
+
+    FACETS_URL = '/api/v1/titles/facets/'
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_01_facets(self, client, django_assert_max_num_queries):
+        create_catalogue()
+        with django_assert_max_num_queries(3):
+            response = client.get(self.FACETS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.FACETS_URL}` доступен '
+            'без авторизации.'
+        )
+        assert response.json() == {
+            'category': [
+                {'slug': 'books', 'count': 1}, {'slug': 'films', 'count': 2}
+            ],
+            'genre': [
+                {'slug': 'comedy', 'count': 2}, {'slug': 'drama', 'count': 2}
+            ],
+            'decade': [
+                {'decade': 1980, 'count': 2},
+                {'decade': 1990, 'count': 1},
+                {'decade': 2000, 'count': 1},
+            ],
+        }
+
+    def test_02_facets_with_filters_and_cache(
+        self, client, django_assert_num_queries
+    ):
+        create_catalogue()
+        url = f'{self.FACETS_URL}?genre=drama&year=1984'
+        data = client.get(url).json()
+        assert data == {
+            'category': [{'slug': 'films', 'count': 1}],
+            'genre': [
+                {'slug': 'comedy', 'count': 1}, {'slug': 'drama', 'count': 1}
+            ],
+            'decade': [{'decade': 1980, 'count': 1}],
+        }, (
+            f'Проверьте, что `{self.FACETS_URL}` учитывает параметры '
+            'фильтрации произведений.'
+        )
+        with django_assert_num_queries(0):
+            assert client.get(f'{url}&page=2').json() == data
+        assert client.get(f'{self.FACETS_URL}?search=первое').json()[
+            'decade'
+        ] == [{'decade': 1980, 'count': 1}]
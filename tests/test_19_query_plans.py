@@ -0,0 +1,93 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+from tests.utils import create_comments
+
+# Запросы, которые API выполняет чаще всего.
+HOT_URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?cursor=',
+    '/api/v1/titles/?genre=drama',
+    '/api/v1/titles/?category=films',
+    '/api/v1/titles/{title_id}/',
+    '/api/v1/titles/{title_id}/reviews/',
+    '/api/v1/titles/{title_id}/reviews/?cursor=',
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/?cursor=',
+    '/api/v1/users/',
+    '/api/v1/users/{username}/',
+    '/api/v1/genres/',
+    '/api/v1/categories/',
+)
+# Больше размера страницы, чтобы проверить и страницы по курсору.
+EXTRA_OBJECTS = 6
+FULL_SCAN = re.compile(r'^SCAN \S+$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def create_extra_objects(django_user_model, title_id, review_id):
+    for idx in range(EXTRA_OBJECTS):
+        author = django_user_model.objects.create_user(
+            username=f'extra{idx}', email=f'extra{idx}@yamdb.fake'
+        )
+        Title.objects.create(name=f'Произведение {idx}', year=2000)
+        Review.objects.create(
+            title_id=title_id, author=author, text='text', score=5
+        )
+        Comment.objects.create(review_id=review_id, author=author, text='t')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN для SQLite'
+)
+@pytest.mark.django_db(transaction=True)
+class Test19QueryPlans:
+
+    def get_select_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            data = client.get(url).json()
+            # Проверяем и вторую страницу, полученную по курсору.
+            if '?cursor=' in url:
+                assert data['next'], f'Для `{url}` нет второй страницы.'
+                client.get(data['next'])
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+        ]
+
+    def test_01_hot_queries_use_indexes(self, admin_client, admin,
+                                        user_client, user,
+                                        django_user_model):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        create_extra_objects(
+            django_user_model, titles[0]['id'], reviews[0]['id']
+        )
+        for url_template in HOT_URLS:
+            url = url_template.format(
+                title_id=titles[0]['id'],
+                review_id=reviews[0]['id'],
+                username=user.username
+            )
+            for sql in self.get_select_queries(admin_client, url):
+                for detail in explain(sql):
+                    assert not FULL_SCAN.match(detail), (
+                        f'Запрос к `{url}` читает всю таблицу ({detail}). '
+                        f'Добавьте подходящий индекс:\n{sql}'
+                    )
+                    assert TEMP_SORT not in detail, (
+                        f'Запрос к `{url}` сортирует строки во временном '
+                        f'B-дереве ({detail}). Добавьте подходящий '
+                        f'индекс:\n{sql}'
+                    )
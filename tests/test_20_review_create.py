@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from threading import Barrier
+
+import pytest
+from django.db import connections
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title
+
+PARALLEL_REQUESTS = 4
+DUPLICATE_ERROR = 'Вы уже оставляли отзыв на это произведение.'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ReviewCreate:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_create_queries(self, user_client,
+                               django_assert_max_num_queries):
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        # Пользователь, произведение, BEGIN, INSERT и пересчёт рейтинга.
+        with django_assert_max_num_queries(5):
+            response = user_client.post(url, data={'text': 't', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+
+        response = user_client.post(url, data={'text': 't', 'score': 5})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {'non_field_errors': [DUPLICATE_ERROR]}, (
+            'Проверьте, что повторный отзыв пользователя на произведение '
+            'возвращает ответ со статусом 400 и прежним сообщением.'
+        )
+        response = user_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id + 1),
+            data={'text': 't', 'score': 5}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_parallel_duplicates(self, file_database, token_user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        barrier = Barrier(PARALLEL_REQUESTS)
+
+        def post_review(score):
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}'
+            )
+            barrier.wait()
+            try:
+                return client.post(
+                    url, data={'text': 'text', 'score': score}
+                ).status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(PARALLEL_REQUESTS) as executor:
+            statuses = list(executor.map(
+                post_review, range(1, PARALLEL_REQUESTS + 1)
+            ))
+        assert sorted(statuses) == [HTTPStatus.CREATED] + [
+            HTTPStatus.BAD_REQUEST
+        ] * (PARALLEL_REQUESTS - 1), (
+            'Проверьте, что параллельные повторные отзывы пользователя '
+            'возвращают ответ со статусом 400, а не 500.'
+        )
+        assert Review.objects.filter(title=title).count() == 1
+        title.refresh_from_db()
+        assert title.reviews_count == 1
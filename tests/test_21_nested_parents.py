@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+def count_parent_queries(context, table):
+    return sum(
+        query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']
+        for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21NestedParents:
+
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_mismatched_chain(self, admin_client, admin, user_client,
+                                 user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        wrong_title_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id']
+        )
+        response = user_client.get(wrong_title_url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что GET-запрос к `{self.COMMENTS_URL_TEMPLATE}` '
+            'с отзывом другого произведения возвращает ответ со статусом 404.'
+        )
+        response = user_client.post(wrong_title_url, data={'text': 'text'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = user_client.get(self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id'],
+            comment_id=comments[0]['id']
+        ))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_parent_loaded_once(self, admin_client, admin, user_client,
+                                   user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'text'})
+            assert response.status_code == HTTPStatus.CREATED
+            response = user_client.patch(
+                self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id'], review_id=reviews[0]['id'],
+                    comment_id=response.json()['id']
+                ),
+                data={'text': 'new text'}
+            )
+            assert response.status_code == HTTPStatus.OK
+        assert count_parent_queries(context, 'reviews_review') <= 2, (
+            'Проверьте, что отзыв загружается не больше одного раза за запрос.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+            )
+            assert response.status_code == HTTPStatus.OK
+        assert count_parent_queries(context, 'reviews_title') == 1
@@ -0,0 +1,179 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+
+def get_write_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith(('UPDATE', 'DELETE'))
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ConditionalWrites:
+
+    REVIEW_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    COMMENT_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+
+    @pytest.fixture
+    def reviews(self, user, moderator):
+        title = Title.objects.create(name='Произведение', year=2000)
+        own = Review.objects.create(
+            title=title, author=user, text='text', score=4
+        )
+        other = Review.objects.create(
+            title=title, author=moderator, text='text', score=8
+        )
+        title.refresh_from_db()
+        return title, own, other
+
+    def get_review_url(self, review, title_id=None):
+        return self.REVIEW_URL_TEMPLATE.format(
+            title_id=title_id or review.title_id, review_id=review.id
+        )
+
+    def test_01_owner_update(self, user_client, reviews):
+        title, own, _ = reviews
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.patch(
+                self.get_review_url(own), data={'text': 'new', 'score': 10}
+            )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (data['text'], data['score']) == ('new', 10)
+        assert len(get_write_queries(context)) == 2, (
+            'Проверьте, что автор меняет отзыв одним UPDATE с условием по '
+            'автору и одним UPDATE суммы оценок произведения.'
+        )
+        assert 'author_id' in get_write_queries(context)[-1]
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (18, 2), (
+            'Проверьте, что изменение оценки автором обновляет рейтинг '
+            'произведения.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.patch(
+                self.get_review_url(own), data={'text': 'newer'}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert len(get_write_queries(context)) == 1
+        title.refresh_from_db()
+        assert title.score_sum == 18
+
+    def test_02_forbidden_and_not_found(self, user_client, reviews):
+        title, own, other = reviews
+        response = user_client.patch(
+            self.get_review_url(other), data={'text': 'new', 'score': 1}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что изменение чужого отзыва возвращает ответ со '
+            'статусом 403.'
+        )
+        other.refresh_from_db()
+        title.refresh_from_db()
+        assert (other.text, other.score) == ('text', 8)
+        assert title.score_sum == 12
+        response = user_client.delete(self.get_review_url(other))
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        assert Review.objects.filter(pk=other.pk).exists()
+
+        for url in (
+            self.get_review_url(own, title_id=title.id + 1),
+            self.REVIEW_URL_TEMPLATE.format(
+                title_id=title.id, review_id=other.id + 1
+            ),
+        ):
+            response = user_client.patch(url, data={'text': 'new'})
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что изменение несуществующего отзыва возвращает '
+                'ответ со статусом 404.'
+            )
+            response = user_client.delete(url)
+            assert response.status_code == HTTPStatus.NOT_FOUND
+        response = user_client.patch(
+            self.get_review_url(own), data={'score': 11}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_owner_delete(self, user_client, user, reviews):
+        title, own, _ = reviews
+        comment = Comment.objects.create(review=own, author=user, text='t')
+        url = self.COMMENT_URL_TEMPLATE.format(
+            title_id=title.id, review_id=own.id, comment_id=comment.id
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert len(get_write_queries(context)) == 1, (
+            'Проверьте, что автор удаляет комментарий одним DELETE с '
+            'условием по автору.'
+        )
+        assert not any(
+            query['sql'].startswith('SELECT "reviews_comment"')
+            for query in context.captured_queries
+        )
+        assert not Comment.objects.filter(pk=comment.pk).exists()
+
+        response = user_client.delete(self.get_review_url(own))
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (8, 1)
+
+    def test_04_moderator_still_edits(self, moderator_client, reviews):
+        title, own, _ = reviews
+        response = moderator_client.patch(
+            self.get_review_url(own), data={'score': 6}
+        )
+        assert response.status_code == HTTPStatus.OK
+        title.refresh_from_db()
+        assert title.score_sum == 14
+        response = moderator_client.delete(self.get_review_url(own))
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_05_owner_empty_update(self, user_client, user, reviews):
+        title, own, other = reviews
+        comment = Comment.objects.create(review=own, author=user, text='t')
+        other_comment = Comment.objects.create(
+            review=own, author=other.author, text='t'
+        )
+        comment_url = self.COMMENT_URL_TEMPLATE.format(
+            title_id=title.id, review_id=own.id, comment_id=comment.id
+        )
+        for url, text in (
+            (self.get_review_url(own), 'text'), (comment_url, 't')
+        ):
+            for data in ({}, {'pub_date': '2000-01-01T00:00:00Z'}):
+                with CaptureQueriesContext(connection) as context:
+                    response = user_client.patch(url, data=data)
+                assert response.status_code == HTTPStatus.OK, (
+                    'Проверьте, что автор может отправить PATCH без '
+                    'изменяемых полей.'
+                )
+                assert response.json()['text'] == text
+                assert not get_write_queries(context)
+
+        for url in (
+            self.get_review_url(other),
+            self.COMMENT_URL_TEMPLATE.format(
+                title_id=title.id, review_id=own.id,
+                comment_id=other_comment.id
+            ),
+        ):
+            response = user_client.patch(url, data={})
+            assert response.status_code == HTTPStatus.FORBIDDEN
+        response = user_client.patch(
+            self.REVIEW_URL_TEMPLATE.format(
+                title_id=title.id, review_id=other.id + 1
+            ),
+            data={}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,140 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import UserCache, get_access_token
+from api.utils import set_confirmation_code
+from reviews.models import Genre, Review, Title, User
+
+
+def get_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23StatelessAuth:
+
+    GENRES_URL = '/api/v1/genres/'
+    USERS_ME_URL = '/api/v1/users/me/'
+    USER_DETAIL_URL_TEMPLATE = '/api/v1/users/{username}/'
+
+    def test_01_token_claims(self, client, user):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': set_confirmation_code(user.username)
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert (token['role'], token['is_staff'], token['username']) == (
+            user.role, user.is_staff, user.username
+        ), (
+            'Проверьте, что токен содержит роль, is_staff и username '
+            'пользователя.'
+        )
+
+    def test_02_permissions_without_queries(self, admin, user,
+                                            django_assert_num_queries):
+        Genre.objects.create(name='Драма', slug='drama')
+        with django_assert_num_queries(0):
+            response = get_client(user).post(
+                self.GENRES_URL, data={'name': 'Комедия', 'slug': 'comedy'}
+            )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что права пользователя проверяются по токену, '
+            'без запроса к базе данных.'
+        )
+        with django_assert_num_queries(4):
+            response = get_client(admin).delete(f'{self.GENRES_URL}drama/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_03_full_user_from_cache(self, user, django_assert_num_queries):
+        client = get_client(user)
+        response = client.get(self.USERS_ME_URL)
+        assert response.status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            assert client.get(self.USERS_ME_URL).json() == response.json(), (
+                'Проверьте, что пользователь повторно берётся из кеша.'
+            )
+        response = client.patch(self.USERS_ME_URL, data={'bio': 'bio'})
+        assert response.status_code == HTTPStatus.OK
+        assert client.get(self.USERS_ME_URL).json()['bio'] == 'bio'
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        response = client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'text', 'score': 5}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        assert Review.objects.get().author_id == user.id
+
+    def test_04_role_change_and_delete(self, admin_client, user):
+        client = get_client(user)
+        assert client.post(
+            self.GENRES_URL, data={'name': 'Драма', 'slug': 'drama'}
+        ).status_code == HTTPStatus.FORBIDDEN
+        url = self.USER_DETAIL_URL_TEMPLATE.format(username=user.username)
+        response = admin_client.patch(url, data={'role': 'admin'})
+        assert response.status_code == HTTPStatus.OK
+        assert client.post(
+            self.GENRES_URL, data={'name': 'Драма', 'slug': 'drama'}
+        ).status_code == HTTPStatus.CREATED, (
+            'Проверьте, что смена роли через `/api/v1/users/{username}/` '
+            'сразу применяется к уже выданным токенам.'
+        )
+
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert client.get(self.USERS_ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что токен удалённого пользователя больше не '
+            'принимается.'
+        )
+
+    def test_05_invalidation_shared_between_processes(self, user):
+        token = get_access_token(user)
+        validated_token = AccessToken(str(token))
+        # Кеши разных процессов (воркеров) сервера.
+        first, second = (
+            UserCache(10, 60, 900), UserCache(10, 60, 900)
+        )
+        assert second.get(user.id).role == user.role
+        assert not second.changed_since(user.id, validated_token['iat'])
+        User.objects.filter(pk=user.id).update(role='moderator')
+        first.invalidate(user.id)
+        assert second.changed_since(user.id, validated_token['iat']), (
+            'Проверьте, что изменение пользователя в одном процессе '
+            'видно кешам пользователей всех процессов.'
+        )
+        assert second.get(user.id).role == 'moderator', (
+            'Проверьте, что пользователь, закешированный другим процессом, '
+            'перечитывается из базы после изменения.'
+        )
+
+    def test_06_changes_outside_api(self, user):
+        client = get_client(user)
+        genre = {'name': 'Драма', 'slug': 'drama'}
+        assert client.post(self.GENRES_URL, data=genre).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        # Изменения через админку или shell сохраняют модель напрямую.
+        user.role = 'admin'
+        user.save()
+        assert client.post(self.GENRES_URL, data=genre).status_code == (
+            HTTPStatus.CREATED
+        ), (
+            'Проверьте, что изменение роли вне API сразу применяется '
+            'к уже выданным токенам.'
+        )
+        user.is_active = False
+        user.save()
+        assert client.get(self.USERS_ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токен заблокированного пользователя отклоняется.'
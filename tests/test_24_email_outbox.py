@@ -0,0 +1,158 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from reviews.models import OutboxEmail
+from reviews.outbox import (
+    claim_pending_emails, deliver_pending_emails, enqueue_email,
+    get_retry_delay
+)
+
+BAD_RECIPIENT = 'bad@yamdb.fake'
+
+
+class CountingBackend(EmailBackend):
+    """locmem-бэкенд, считающий открытые соединения."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.opened = 0
+
+    def open(self):
+        self.opened += 1
+        return True
+
+
+class FlakyBackend(CountingBackend):
+    """Не принимает письма для BAD_RECIPIENT."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if BAD_RECIPIENT in message.to:
+                raise ConnectionError('Почтовый сервер недоступен')
+        return super().send_messages(messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_enqueues_email(self, client):
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == 0, (
+            f'Проверьте, что `{self.URL_SIGNUP}` не отправляет письмо во '
+            'время запроса.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == data['email']
+        assert email.sent_at is None
+
+        call_command('send_outbox_emails')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == [data['email']]
+        email.refresh_from_db()
+        assert (email.attempts, email.failed_at) == (1, None)
+        assert email.sent_at is not None
+
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'other@yamdb.fake', 'username': data['username']
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert OutboxEmail.objects.count() == 1, (
+            'Проверьте, что при ошибке регистрации письмо не попадает '
+            'в очередь.'
+        )
+
+    def test_02_batches_share_connection(self, django_assert_num_queries):
+        for idx in range(5):
+            enqueue_email('Тема', 'Текст', f'user{idx}@yamdb.fake')
+        connection = CountingBackend()
+        # Захват, выборка и сохранение трёх пакетов и пустой захват.
+        with django_assert_num_queries(13):
+            assert deliver_pending_emails(
+                batch_size=2, connection=connection
+            ) == (5, 0, 0)
+        assert connection.opened == 1, (
+            'Проверьте, что все пакеты отправляются через одно соединение.'
+        )
+        assert len(mail.outbox) == 5
+        assert deliver_pending_emails(connection=connection) == (0, 0, 0)
+        assert len(mail.outbox) == 5
+
+    @override_settings(
+        EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+        EMAIL_OUTBOX_RETRY_DELAY=60,
+        EMAIL_OUTBOX_RETRY_MAX_DELAY=200
+    )
+    def test_03_retry_and_dead_letter(self):
+        assert [
+            get_retry_delay(attempts).total_seconds()
+            for attempts in (1, 2, 3, 4)
+        ] == [60, 120, 200, 200]
+        bad = enqueue_email('Тема', 'Текст', BAD_RECIPIENT)
+        enqueue_email('Тема', 'Текст', 'good@yamdb.fake')
+        enqueue_email('Тема', 'Текст', 'good2@yamdb.fake')
+        before = timezone.now()
+        assert deliver_pending_emails(connection=FlakyBackend()) == (
+            2, 0, 1
+        ), 'Проверьте, что ошибка одного письма не мешает отправке других.'
+        bad.refresh_from_db()
+        assert bad.attempts == 1
+        assert bad.sent_at is None and bad.failed_at is None
+        assert 'ConnectionError' in bad.last_error
+        assert bad.next_attempt_at >= before + timedelta(seconds=60), (
+            'Проверьте, что повторная попытка откладывается.'
+        )
+        assert deliver_pending_emails(connection=FlakyBackend()) == (0, 0, 0)
+
+        OutboxEmail.objects.filter(pk=bad.pk).update(
+            next_attempt_at=timezone.now()
+        )
+        assert deliver_pending_emails(connection=FlakyBackend()) == (0, 1, 0)
+        bad.refresh_from_db()
+        assert (bad.attempts, bad.sent_at) == (2, None)
+        assert bad.failed_at is not None, (
+            'Проверьте, что после EMAIL_OUTBOX_MAX_ATTEMPTS попыток письмо '
+            'больше не отправляется.'
+        )
+        OutboxEmail.objects.filter(pk=bad.pk).update(
+            next_attempt_at=timezone.now()
+        )
+        assert deliver_pending_emails(connection=FlakyBackend()) == (0, 0, 0)
+        assert len(mail.outbox) == 2
+
+    @override_settings(EMAIL_OUTBOX_CLAIM_TIMEOUT=600)
+    def test_04_claimed_emails_skipped(self):
+        for idx in range(3):
+            enqueue_email('Тема', 'Текст', f'user{idx}@yamdb.fake')
+        # Другой обработчик захватил два письма и ещё отправляет их.
+        claimed = claim_pending_emails(2, timezone.now())
+        assert len(claimed) == 2
+        assert deliver_pending_emails(connection=CountingBackend()) == (
+            1, 0, 0
+        ), (
+            'Проверьте, что письма, захваченные другим обработчиком '
+            'очереди, не отправляются повторно.'
+        )
+        assert claim_pending_emails(2, timezone.now()) == []
+
+        # Обработчик упал, не сохранив результат: письма вернутся
+        # в очередь по истечении срока захвата.
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in claimed]
+        ).update(next_attempt_at=timezone.now())
+        assert deliver_pending_emails(connection=CountingBackend()) == (
+            2, 0, 0
+        )
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'user{idx}@yamdb.fake' for idx in range(3)
+        ]
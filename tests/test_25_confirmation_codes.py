@@ -0,0 +1,116 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from threading import Barrier
+
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.utils import consume_confirmation_code, set_confirmation_code
+from reviews.models import OutboxEmail
+
+PARALLEL_REQUESTS = 8
+
+
+def get_user_writes(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if re.match(r'(INSERT INTO|UPDATE) "reviews_user"', query['sql'])
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25ConfirmationCodes:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    SIGNUP_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+    def signup(self, client):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        assert response.status_code == HTTPStatus.OK
+        code = re.search(
+            r'\d+$', OutboxEmail.objects.latest('id').body
+        ).group()
+        return code, get_user_writes(context)
+
+    def get_token(self, client, code):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_TOKEN, data={
+                'username': self.SIGNUP_DATA['username'],
+                'confirmation_code': code
+            })
+        assert not get_user_writes(context), (
+            f'Проверьте, что `{self.URL_TOKEN}` не изменяет таблицу '
+            'пользователей.'
+        )
+        return response.status_code
+
+    def test_01_codes_not_stored_in_users(self, client):
+        _, writes = self.signup(client)
+        assert len(writes) == 1
+        code, writes = self.signup(client)
+        assert not writes, (
+            f'Проверьте, что повторный запрос к `{self.URL_SIGNUP}` не '
+            'изменяет таблицу пользователей.'
+        )
+        assert self.get_token(client, code) == HTTPStatus.OK
+        assert self.get_token(client, code) == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения можно использовать один раз.'
+        )
+
+    def test_02_wrong_code_burns_code(self, client):
+        code, _ = self.signup(client)
+        wrong_code = str((int(code) + 1) % 10 ** len(code)).zfill(len(code))
+        assert self.get_token(client, wrong_code) == HTTPStatus.BAD_REQUEST
+        assert self.get_token(client, code) == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что после неверной попытки код подтверждения '
+            'перестаёт действовать.'
+        )
+        code, _ = self.signup(client)
+        assert self.get_token(client, code) == HTTPStatus.OK
+
+    @override_settings(CONFIRMATION_CODE_TIMEOUT=0)
+    def test_03_expired_code(self, client):
+        code, _ = self.signup(client)
+        assert self.get_token(client, code) == HTTPStatus.BAD_REQUEST
+
+    def test_04_parallel_consume(self):
+        code = set_confirmation_code('valid_username')
+        barrier = Barrier(PARALLEL_REQUESTS)
+
+        def consume(_):
+            barrier.wait()
+            return consume_confirmation_code('valid_username', code)
+
+        with ThreadPoolExecutor(PARALLEL_REQUESTS) as executor:
+            results = list(executor.map(consume, range(PARALLEL_REQUESTS)))
+        assert results.count(True) == 1, (
+            'Проверьте, что код подтверждения погашается ровно один раз.'
+        )
+
+    def test_05_signup_during_consume(self, client, monkeypatch):
+        old_code = set_confirmation_code('valid_username')
+        store = caches[settings.CONFIRMATION_CODE_CACHE]
+        get = store.get
+        new_codes = []
+
+        def get_then_signup(key, *args, **kwargs):
+            value = get(key, *args, **kwargs)
+            # Повторная регистрация между чтением и удалением кода.
+            if not new_codes:
+                new_codes.append(set_confirmation_code('valid_username'))
+            return value
+
+        monkeypatch.setattr(store, 'get', get_then_signup)
+        assert consume_confirmation_code('valid_username', old_code)
+        monkeypatch.setattr(store, 'get', get)
+        assert consume_confirmation_code('valid_username', new_codes[0]), (
+            'Проверьте, что погашение прежнего кода не удаляет код, '
+            'выданный повторной регистрацией.'
+        )
@@ -0,0 +1,141 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from threading import Barrier
+
+import pytest
+from django.core.cache import cache
+
+from api.throttling import CacheBucketStore, CombinedThrottle, local_buckets
+
+THROTTLE_RATES = {'auth_ip': '3/min', 'auth_identity': '2/min'}
+PARALLEL_REQUESTS = 8
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26AuthThrottling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    @pytest.fixture(autouse=True)
+    def clock(self, monkeypatch, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': THROTTLE_RATES,
+        }
+        now = [1000.0]
+        monkeypatch.setattr(
+            CombinedThrottle, 'timer', staticmethod(lambda: now[0])
+        )
+        cache.clear()
+        yield now
+        cache.clear()
+
+    def signup(self, client, idx, username=None, ip='10.0.0.1'):
+        return client.post(self.URL_SIGNUP, data={
+            'username': username or f'user{idx}',
+            'email': f'user{idx}@yamdb.fake'
+        }, REMOTE_ADDR=ip)
+
+    def assert_throttled(self, response, retry_after):
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что при превышении лимита возвращается ответ со '
+            'статусом 429.'
+        )
+        assert response['Retry-After'] == retry_after
+
+    def test_01_identity_limit(self, client, django_assert_num_queries,
+                               clock):
+        for idx in range(2):
+            response = self.signup(client, idx, username='same')
+            assert response.status_code in (
+                HTTPStatus.OK, HTTPStatus.BAD_REQUEST
+            )
+        with django_assert_num_queries(0):
+            response = self.signup(client, 2, username='same')
+        self.assert_throttled(response, '30')
+        # Второй запрос с тем же email ещё проходит, третий - нет.
+        assert self.signup(
+            client, 0, username='other'
+        ).status_code == HTTPStatus.BAD_REQUEST
+        with django_assert_num_queries(0):
+            response = self.signup(client, 0, username='another')
+        self.assert_throttled(response, '30')
+
+        clock[0] += 30
+        assert self.signup(
+            client, 4, username='same'
+        ).status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что лимит восстанавливается со временем.'
+        )
+
+    def test_02_identity_limit_across_ips(self, client):
+        for idx in range(2):
+            self.signup(client, idx, username='victim', ip=f'10.6.6.{idx}')
+        response = self.signup(client, 2, username='victim', ip='10.6.6.2')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что лимит для username действует при запросах '
+            'с разных IP.'
+        )
+        for idx in range(2):
+            self.signup(client, 3, username=f'other{idx}', ip=f'10.7.7.{idx}')
+        self.assert_throttled(
+            self.signup(client, 3, username='another', ip='10.7.7.2'), '30'
+        )
+
+    def test_03_rejected_request_not_debited(self, client):
+        for idx in range(2):
+            self.signup(client, 0, username='same')
+        self.assert_throttled(self.signup(client, 0, username='same'), '30')
+        self.assert_throttled(self.signup(client, 0, username='same'), '30')
+        assert self.signup(client, 1).status_code == HTTPStatus.OK, (
+            'Проверьте, что запрос, отклонённый одним лимитом, не расходует '
+            'остальные лимиты.'
+        )
+
+    def test_04_ip_limit(self, client, django_assert_num_queries):
+        for idx in range(3):
+            assert self.signup(client, idx).status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            response = self.signup(client, 3)
+        self.assert_throttled(response, '20')
+        assert self.signup(client, 3, ip='10.0.0.2').status_code == (
+            HTTPStatus.OK
+        )
+        # Лимиты эндпоинтов независимы.
+        response = client.post(self.URL_TOKEN, data={
+            'username': 'user0', 'confirmation_code': '00000'
+        }, REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_token_limit(self, client, user, django_assert_num_queries):
+        data = {'username': user.username, 'confirmation_code': '00000'}
+        for _ in range(2):
+            response = client.post(self.URL_TOKEN, data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        with django_assert_num_queries(0):
+            response = client.post(self.URL_TOKEN, data=data)
+        self.assert_throttled(response, '30')
+
+    def test_06_shared_cache(self, client, settings):
+        settings.THROTTLE_BUCKET_CACHE = 'default'
+        for idx in range(3):
+            assert self.signup(client, idx).status_code == HTTPStatus.OK
+        local_buckets.clear()
+        self.assert_throttled(self.signup(client, 3), '20')
+
+    def test_07_shared_cache_parallel(self):
+        store = CacheBucketStore('default')
+        buckets = [('throttle:test:bucket', 3, 3 / 60, 60)]
+        barrier = Barrier(PARALLEL_REQUESTS)
+
+        def take(_):
+            barrier.wait()
+            return store.take(buckets, 1000.0)
+
+        with ThreadPoolExecutor(PARALLEL_REQUESTS) as executor:
+            waits = list(executor.map(take, range(PARALLEL_REQUESTS)))
+        assert waits.count(0) == 3, (
+            'Проверьте, что параллельные запросы не расходуют корзину '
+            'в общем кеше сверх её ёмкости.'
+        )
@@ -0,0 +1,53 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+from reviews.sqlite import apply_sqlite_pragmas
+
+EXPECTED_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 1,
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 ** 2,
+    'temp_store': 2,
+}
+
+
+def read_pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='PRAGMA применяются только к SQLite'
+)
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('file_database')
+class Test27SqlitePragmas:
+
+    def test_01_pragmas_applied(self):
+        connection.ensure_connection()
+        for name, value in EXPECTED_PRAGMAS.items():
+            assert read_pragma(name) == value, (
+                f'Проверьте, что при подключении к SQLite выполняется '
+                f'`PRAGMA {name} = {value}`.'
+            )
+
+    def test_02_pragmas_from_settings(self, settings):
+        connection.ensure_connection()
+        settings.SQLITE_PRAGMAS = {'cache_size': '-4000', 'temp_store': 1}
+        try:
+            apply_sqlite_pragmas(sender=None, connection=connection)
+            assert read_pragma('cache_size') == -4000
+            assert read_pragma('temp_store') == 1
+
+            settings.SQLITE_PRAGMAS = {
+                'cache_size': '0; DROP TABLE reviews_title'
+            }
+            with pytest.raises(ImproperlyConfigured):
+                apply_sqlite_pragmas(sender=None, connection=connection)
+        finally:
+            # Следующие тесты получат подключение с PRAGMA из настроек.
+            connection.close()
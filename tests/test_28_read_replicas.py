@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connections
+from rest_framework.test import APIClient
+
+from api import replicas
+from reviews.models import Genre, Review, Title
+
+
+@pytest.fixture
+def sync_replica():
+    """Копирует основную тестовую базу SQLite в реплику."""
+    def sync():
+        source, target = connections['default'], connections['replica']
+        source.ensure_connection()
+        target.ensure_connection()
+        source.connection.backup(target.connection)
+    return sync
+
+
+@pytest.mark.skipif(
+    connections['default'].vendor != 'sqlite',
+    reason='реплика синхронизируется средствами SQLite'
+)
+@pytest.mark.django_db(transaction=True, databases=('default', 'replica'))
+class Test28ReadReplicas:
+
+    GENRES_URL = '/api/v1/genres/'
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    @pytest.fixture(autouse=True)
+    def replica_reads(self, settings):
+        settings.REPLICA_READS = True
+
+    def get_count(self, client, url, **kwargs):
+        response = client.get(url, **kwargs)
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['count']
+
+    def test_01_reads_from_replica(self, client, admin_client, sync_replica):
+        sync_replica()
+        Title.objects.create(name='Произведение', year=2000)
+        assert self.get_count(client, self.TITLES_URL) == 0, (
+            'Проверьте, что GET-запросы к каталогу читают с реплики.'
+        )
+        Genre.objects.create(name='Драма', slug='drama')
+        assert self.get_count(client, self.GENRES_URL) == 0
+        sync_replica()
+        assert self.get_count(client, self.TITLES_URL) == 1
+
+        assert self.get_count(client, self.GENRES_URL) == 1
+        response = admin_client.post(
+            self.GENRES_URL, data={'name': 'Комедия', 'slug': 'comedy'}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что запись идёт в основную базу.'
+        )
+        assert Genre.objects.filter(slug='comedy').exists()
+        assert not Genre.objects.using('replica').filter(
+            slug='comedy'
+        ).exists()
+
+    def test_02_read_your_writes(self, user_client, sync_replica,
+                                 monkeypatch):
+        title = Title.objects.create(name='Произведение', year=2000)
+        sync_replica()
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        response = user_client.post(url, data={'text': 'text', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        sticky_until = response[replicas.STICKY_HEADER]
+        assert response.cookies['primary_until'].value == sticky_until
+        assert Review.objects.using('replica').count() == 0
+
+        assert self.get_count(user_client, url) == 1, (
+            'Проверьте, что после записи клиент читает из основной базы.'
+        )
+        assert self.get_count(APIClient(), url) == 0
+        assert self.get_count(
+            APIClient(), url, HTTP_X_PRIMARY_UNTIL=sticky_until
+        ) == 1, 'Проверьте, что закрепление передаётся и в заголовке.'
+
+        now = float(sticky_until) + 1
+        monkeypatch.setattr(replicas.time, 'time', lambda: now)
+        assert self.get_count(user_client, url) == 0, (
+            'Проверьте, что по истечении REPLICA_STICKY_SECONDS клиент '
+            'снова читает с реплики.'
+        )
+        sync_replica()
+        assert self.get_count(user_client, url) == 1
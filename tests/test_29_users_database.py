@@ -0,0 +1,116 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Comment, OutboxEmail, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True, databases=('default', 'users'))
+@pytest.mark.usefixtures('separate_publication_databases')
+class Test29UsersDatabase:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_REVIEWS = '/api/v1/titles/{title_id}/reviews/'
+    URL_COMMENTS = '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+
+    @pytest.fixture(autouse=True)
+    def users_database(self, settings):
+        settings.USERS_DATABASE = 'users'
+
+    def test_01_publications_join_authors(self, user_client, user,
+                                          django_assert_max_num_queries):
+        assert User.objects.using('users').filter(pk=user.pk).exists()
+        assert not User.objects.using('default').exists(), (
+            'Проверьте, что при USERS_DATABASE пользователи сохраняются '
+            'в отдельной базе.'
+        )
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = self.URL_REVIEWS.format(title_id=title.id)
+        response = user_client.post(url, data={'text': 'text', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        review = Review.objects.get()
+        assert review.author_id == user.id
+
+        response = user_client.post(
+            self.URL_COMMENTS.format(title_id=title.id, review_id=review.id),
+            data={'text': 'comment'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        for url in (
+            url,
+            f'{url}?fields=id,author',
+            self.URL_COMMENTS.format(title_id=title.id, review_id=review.id)
+        ):
+            with django_assert_max_num_queries(4):
+                response = user_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.json()['results'][0]['author'] == (
+                user.username
+            ), (
+                'Проверьте, что авторы публикаций подгружаются из базы '
+                'пользователей.'
+            )
+
+        response = user_client.patch(
+            f'{url}{Comment.objects.get().id}/', data={'text': 'new'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['author'] == user.username
+
+    def test_02_signup_writes_users_database(self, client):
+        response = client.post(self.URL_SIGNUP, data={
+            'username': 'new_user', 'email': 'new_user@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert User.objects.using('users').filter(
+            username='new_user'
+        ).exists()
+        assert OutboxEmail.objects.using('users').filter(
+            recipient='new_user@yamdb.fake'
+        ).exists()
+        assert not OutboxEmail.objects.using('default').exists()
+
+    def test_03_user_delete_removes_publications(self, admin_client, admin,
+                                                 user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        own_review = Review.objects.create(
+            title=title, author=admin, text='text', score=9
+        )
+        review = Review.objects.create(
+            title=title, author=user, text='text', score=3
+        )
+        Comment.objects.create(review=own_review, author=user, text='text')
+        Comment.objects.create(review=review, author=admin, text='text')
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert list(Review.objects.all()) == [own_review], (
+            'Проверьте, что при удалении пользователя удаляются его отзывы.'
+        )
+        assert not Comment.objects.exists(), (
+            'Проверьте, что при удалении пользователя удаляются его '
+            'комментарии и комментарии к его отзывам.'
+        )
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (9, 1)
+
+    def test_04_split_command(self, settings):
+        settings.USERS_DATABASE = 'default'
+        users = [
+            User.objects.create(
+                username=f'user{idx}', email=f'user{idx}@yamdb.fake'
+            )
+            for idx in range(3)
+        ]
+        call_command('split_users_database')
+        assert [
+            (user.id, user.username)
+            for user in User.objects.using('users').order_by('id')
+        ] == [(user.id, user.username) for user in users], (
+            'Проверьте, что команда split_users_database копирует '
+            'пользователей с теми же id.'
+        )
+        with pytest.raises(CommandError):
+            call_command('split_users_database')
@@ -0,0 +1,202 @@
+from http import HTTPStatus
+
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import CommandError, call_command
+
+from reviews.models import Comment, Review, Title
+from reviews.sharding import ShardRoutingError, get_shard
+
+SHARDS = settings.REVIEW_SHARDS
+
+
+@pytest.mark.django_db(
+    transaction=True, databases=('default', 'users', *SHARDS)
+)
+@pytest.mark.usefixtures('separate_publication_databases')
+class Test30ReviewSharding:
+
+    URL_REVIEWS = '/api/v1/titles/{title_id}/reviews/'
+    URL_COMMENTS = '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+
+    @pytest.fixture(autouse=True)
+    def sharding(self, settings):
+        settings.REVIEW_SHARDING = True
+
+    @pytest.fixture
+    def titles(self):
+        """Произведения, попадающие во все шарды."""
+        titles = {}
+        year = 2000
+        while len(titles) < len(SHARDS):
+            title = Title.objects.create(name='Произведение', year=year)
+            titles.setdefault(get_shard(title.id), title)
+            year += 1
+        return list(titles.values())
+
+    def shard_counts(self, model):
+        return {
+            alias: model.objects.using(alias).count()
+            for alias in ('default', *SHARDS)
+        }
+
+    def test_01_publications_routed_to_title_shard(self, user_client,
+                                                   admin_client, titles):
+        for title in titles:
+            url = self.URL_REVIEWS.format(title_id=title.id)
+            response = user_client.post(url, data={'text': 't', 'score': 4})
+            assert response.status_code == HTTPStatus.CREATED
+            review_id = response.json()['id']
+            response = user_client.post(
+                self.URL_COMMENTS.format(
+                    title_id=title.id, review_id=review_id
+                ),
+                data={'text': 'comment'}
+            )
+            assert response.status_code == HTTPStatus.CREATED
+            assert Review.objects.using(get_shard(title.id)).filter(
+                pk=review_id, title_id=title.id
+            ).exists(), (
+                'Проверьте, что отзыв сохраняется в шард произведения.'
+            )
+            response = user_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert [
+                review['id'] for review in response.json()['results']
+            ] == [review_id]
+
+            response = user_client.patch(
+                f'{url}{review_id}/', data={'score': 8}
+            )
+            assert response.status_code == HTTPStatus.OK
+            title.refresh_from_db()
+            assert (title.score_sum, title.reviews_count) == (8, 1), (
+                'Проверьте, что рейтинг произведения учитывает изменение '
+                'оценки в шарде.'
+            )
+            response = admin_client.patch(
+                f'{url}{review_id}/', data={'score': 2}
+            )
+            assert response.status_code == HTTPStatus.OK
+            title.refresh_from_db()
+            assert title.score_sum == 2
+        expected = {'default': 0, **dict.fromkeys(SHARDS, 1)}
+        assert self.shard_counts(Review) == expected
+        assert self.shard_counts(Comment) == expected
+
+        title = titles[0]
+        review = Review.objects.for_title(title.id).get()
+        response = user_client.delete(
+            self.URL_COMMENTS.format(title_id=title.id, review_id=review.id)
+            + f'{Comment.objects.for_title(title.id).get().id}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = admin_client.delete(
+            f'{self.URL_REVIEWS.format(title_id=title.id)}{review.id}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (0, 0)
+
+    def test_02_cross_shard_operations(self, admin_client, admin, user,
+                                       titles):
+        for title in titles:
+            review = Review.objects.for_title(title.id).create(
+                title=title, author=user, text='text', score=5
+            )
+            Comment.objects.for_title(title.id).create(
+                review=review, author=admin, text='text'
+            )
+            Review.objects.for_title(title.id).create(
+                title=title, author=admin, text='text', score=7
+            )
+        response = admin_client.get(f'/api/v1/users/{user.username}/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        reviews = response.json()
+        assert [review['title'] for review in reviews] == [
+            title.id for title in reversed(titles)
+        ], (
+            'Проверьте, что отзывы пользователя собираются из всех шардов '
+            'и упорядочены по дате публикации.'
+        )
+        assert {review['author'] for review in reviews} == {user.username}
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.shard_counts(Review) == {
+            'default': 0, **dict.fromkeys(SHARDS, 1)
+        }, 'Проверьте, что отзывы удалённого пользователя удаляются из шардов.'
+        assert not any(self.shard_counts(Comment).values())
+
+        response = admin_client.delete(f'/api/v1/titles/{titles[0].id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Review.objects.using(get_shard(titles[0].id)).exists(), (
+            'Проверьте, что при удалении произведения удаляются его отзывы.'
+        )
+
+    def test_03_shard_existing_reviews(self, settings, admin, user, titles):
+        settings.REVIEW_SHARDING = False
+        for title in titles:
+            for author in (admin, user):
+                review = Review.objects.create(
+                    title=title, author=author, text='text', score=6
+                )
+                Comment.objects.create(review=review, author=user, text='t')
+        Title.objects.update(score_sum=0, reviews_count=0)
+
+        settings.REVIEW_SHARDING = True
+        call_command('shard_reviews')
+        expected = {'default': 4, **dict.fromkeys(SHARDS, 2)}
+        assert self.shard_counts(Review) == expected
+        assert self.shard_counts(Comment) == expected
+        for title in titles:
+            shard = get_shard(title.id)
+            assert set(
+                Comment.objects.using(shard).values_list(
+                    'review__title_id', flat=True
+                )
+            ) == {title.id}
+
+        call_command('rebuild_title_ratings')
+        assert set(
+            Title.objects.filter(
+                pk__in=[title.id for title in titles]
+            ).values_list('score_sum', 'reviews_count')
+        ) == {(12, 2)}, (
+            'Проверьте, что rebuild_title_ratings считает рейтинги '
+            'по шардам.'
+        )
+        with pytest.raises(CommandError):
+            call_command('shard_reviews')
+
+    def test_04_unrouted_queries_fail(self, user, titles):
+        title = titles[0]
+        review = Review.objects.for_title(title.id).create(
+            title=title, author=user, text='text', score=5
+        )
+        for get_queryset in (
+            Review.objects.all,
+            lambda: Comment.objects.filter(review__title_id=title.id),
+            lambda: user.reviews.all(),
+        ):
+            with pytest.raises(ShardRoutingError):
+                list(get_queryset())
+        with pytest.raises(ShardRoutingError):
+            Comment(review_id=review.id, author=user, text='text').save()
+        assert list(title.reviews.all()) == [review], (
+            'Проверьте, что запросы с подсказкой шарда выполняются.'
+        )
+
+    def test_05_seed_test_data(self):
+        call_command('seed_test_data', stdout=StringIO())
+        for model in (Review, Comment):
+            counts = self.shard_counts(model)
+            assert counts['default'] and sum(
+                counts[alias] for alias in SHARDS
+            ) == counts['default'], (
+                'Проверьте, что seed_test_data при шардировании загружает '
+                'отзывы и комментарии и копирует их в шарды.'
+            )
+        assert Title.objects.filter(reviews_count__gt=0).exists()
@@ -0,0 +1,187 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+from api.metrics import LATENCY_BUCKETS, registry
+
+SAMPLE = re.compile(r'^(?P<name>\w+)\{(?P<labels>[^}]*)\} (?P<value>\S+)$')
+
+
+def parse_metrics(text):
+    samples = {}
+    for line in text.splitlines():
+        match = SAMPLE.match(line)
+        if match:
+            samples[
+                (match['name'], match['labels'])
+            ] = float(match['value'])
+    return samples
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31Metrics:
+
+    URL_METRICS = '/metrics'
+    URL_TITLES = '/api/v1/titles/'
+    TITLE_LIST = 'route="title-list",method="GET",status="200"'
+
+    TOKEN = 'metrics-token'
+
+    @pytest.fixture(autouse=True)
+    def clear_metrics(self, settings):
+        settings.METRICS_TOKEN = self.TOKEN
+        registry.clear()
+        yield
+        registry.clear()
+
+    def get_samples(self, client):
+        response = client.get(
+            self.URL_METRICS, HTTP_AUTHORIZATION=f'Bearer {self.TOKEN}'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain')
+        return parse_metrics(response.content.decode())
+
+    def test_01_route_metrics(self, client):
+        for _ in range(2):
+            assert client.get(self.URL_TITLES).status_code == HTTPStatus.OK
+        response = client.get('/api/v1/missing/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        sizes = len(client.get(self.URL_TITLES).content) * 3
+
+        samples = self.get_samples(client)
+        assert samples[
+            ('yamdb_http_requests_total', self.TITLE_LIST)
+        ] == 3, 'Проверьте, что запросы считаются по маршрутам.'
+        assert samples[
+            ('yamdb_http_requests_total',
+             'route="unresolved",method="GET",status="404"')
+        ] == 1
+        assert samples[
+            ('yamdb_http_db_queries_total', self.TITLE_LIST)
+        ] >= 3, 'Проверьте, что считаются запросы к БД.'
+        assert samples[
+            ('yamdb_http_db_duration_seconds_total', self.TITLE_LIST)
+        ] > 0
+        assert samples[
+            ('yamdb_http_response_size_bytes_total', self.TITLE_LIST)
+        ] == sizes
+        buckets = [
+            samples[(
+                'yamdb_http_request_duration_seconds_bucket',
+                f'{self.TITLE_LIST},le="{bound}"'
+            )]
+            for bound in (*LATENCY_BUCKETS, '+Inf')
+        ]
+        assert buckets == sorted(buckets) and buckets[-1] == 3, (
+            'Проверьте, что гистограмма длительности накопительная.'
+        )
+        assert samples[
+            ('yamdb_http_request_duration_seconds_count', self.TITLE_LIST)
+        ] == 3
+
+    def test_02_threads_are_summed(self, client):
+        def get_titles():
+            for _ in range(3):
+                Client().get(self.URL_TITLES)
+
+        threads = [threading.Thread(target=get_titles) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert self.get_samples(client)[
+            ('yamdb_http_requests_total', self.TITLE_LIST)
+        ] == 6, 'Проверьте, что складываются счётчики всех потоков.'
+        assert all(thread.is_alive() for thread, _ in registry._threads), (
+            'Проверьте, что счётчики завершённых потоков не хранятся '
+            'отдельно для каждого потока.'
+        )
+
+    def test_03_shared_directory(self, client, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        client.get(self.URL_TITLES)
+        other = [0] * (len(LATENCY_BUCKETS) + 1)
+        other[0] = 5
+        (tmp_path / f'{os.getpid()}-other.json').write_text(json.dumps([
+            [['title-list', 'GET', '200'], [5, 0.01, 10, 0.005, 500], other]
+        ]))
+        samples = self.get_samples(client)
+        assert samples[
+            ('yamdb_http_requests_total', self.TITLE_LIST)
+        ] == 6, (
+            'Проверьте, что при METRICS_DIR метрики процессов суммируются.'
+        )
+        assert samples[(
+            'yamdb_http_request_duration_seconds_bucket',
+            f'{self.TITLE_LIST},le="{LATENCY_BUCKETS[0]}"'
+        )] >= 5
+        assert len(list(tmp_path.glob('*.json'))) == 2
+
+    def test_04_finished_processes_archived(self, client, settings,
+                                            tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        process = subprocess.Popen([sys.executable, '-c', ''])
+        process.wait()
+        other = [0] * (len(LATENCY_BUCKETS) + 1)
+        other[0] = 5
+        finished = tmp_path / f'{process.pid}-finished.json'
+        finished.write_text(json.dumps([
+            [['title-list', 'GET', '200'], [5, 0.01, 10, 0.005, 500], other]
+        ]))
+        client.get(self.URL_TITLES)
+        for _ in range(2):
+            assert self.get_samples(client)[
+                ('yamdb_http_requests_total', self.TITLE_LIST)
+            ] == 6, (
+                'Проверьте, что счётчики завершённых процессов переносятся '
+                'в архив и учитываются один раз.'
+            )
+        assert not finished.exists()
+        assert (tmp_path / 'archive.json').exists()
+
+        call_command('clear_metrics')
+        assert not list(tmp_path.glob('*.json')), (
+            'Проверьте, что команда clear_metrics очищает METRICS_DIR.'
+        )
+
+    def test_05_metrics_require_token(self, client, settings):
+        response = client.get(
+            self.URL_METRICS, HTTP_AUTHORIZATION='Bearer wrong'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что /metrics недоступен без токена METRICS_TOKEN.'
+        )
+        assert client.get(self.URL_METRICS).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        settings.METRICS_TOKEN = None
+        response = client.get(
+            self.URL_METRICS, HTTP_AUTHORIZATION=f'Bearer {self.TOKEN}'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что без METRICS_TOKEN адрес /metrics отключён.'
+        )
+
+    def test_06_unknown_methods_share_label(self, client):
+        for method in ('FOO1', 'FOO2'):
+            client.generic(method, self.URL_TITLES)
+        samples = self.get_samples(client)
+        requests = {
+            labels: value for (name, labels), value in samples.items()
+            if name == 'yamdb_http_requests_total'
+        }
+        assert list(requests.values()) == [2] and all(
+            'method="other"' in labels for labels in requests
+        ), (
+            'Проверьте, что нестандартные методы учитываются с меткой '
+            'method="other".'
+        )
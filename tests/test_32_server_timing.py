@@ -0,0 +1,102 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import api.profiling
+from reviews.models import Title
+
+SERVER_TIMING = re.compile(r'^(\w+);dur=(\d+\.\d)$')
+
+
+def parse_server_timing(header):
+    timings = {}
+    for entry in header.split(', '):
+        match = SERVER_TIMING.match(entry)
+        assert match, f'Некорректная запись Server-Timing: {entry}'
+        timings[match[1]] = float(match[2])
+    return timings
+
+
+@pytest.mark.django_db(transaction=True)
+class Test32ServerTiming:
+
+    URL_TITLES = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def server_timing(self, settings):
+        settings.SERVER_TIMING = True
+        Title.objects.create(name='Произведение', year=2000)
+
+    def test_01_disabled_by_default(self, client, settings):
+        settings.SERVER_TIMING = False
+        response = client.get(self.URL_TITLES)
+        assert 'Server-Timing' not in response
+        assert 'X-DB-Queries' not in response
+
+    def test_02_headers(self, user_client):
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(self.URL_TITLES)
+        assert response.status_code == HTTPStatus.OK
+        timings = parse_server_timing(response['Server-Timing'])
+        assert list(timings) == ['db', 'serialize', 'render', 'total'], (
+            'Проверьте, что Server-Timing содержит db, serialize, render '
+            'и total.'
+        )
+        assert timings['total'] >= max(
+            timings['db'], timings['serialize'], timings['render']
+        )
+        assert int(response['X-DB-Queries']) == len(context), (
+            'Проверьте, что X-DB-Queries равен количеству запросов к БД.'
+        )
+        response = user_client.get(self.URL_TITLES, {'_explain': '1'})
+        assert 'results' in response.json(), (
+            'Проверьте, что режим _explain доступен только администратору.'
+        )
+
+    def test_03_explain(self, admin_client):
+        response = admin_client.get(self.URL_TITLES, {'_explain': '1'})
+        assert response.status_code == HTTPStatus.OK
+        assert 'Server-Timing' in response
+        data = response.json()
+        assert data['status'] == HTTPStatus.OK
+        assert data['response']['results'][0]['name'] == 'Произведение'
+        assert len(data['queries']) == int(response['X-DB-Queries'])
+        selects = [
+            query for query in data['queries']
+            if query['sql'].startswith('SELECT')
+        ]
+        assert selects and all(query['plan'] for query in selects), (
+            'Проверьте, что для выполненных запросов возвращаются планы.'
+        )
+        assert any('reviews_title' in query['sql'] for query in selects)
+
+    def test_04_explain_only_for_admin_safe_requests(self, admin_client,
+                                                     user_client,
+                                                     monkeypatch):
+        records = []
+        track_queries = api.profiling.track_queries
+
+        def spy_track_queries(record=False):
+            records.append(record)
+            return track_queries(record)
+
+        monkeypatch.setattr(api.profiling, 'track_queries', spy_track_queries)
+        response = user_client.get(self.URL_TITLES, {'_explain': '1'})
+        assert response.status_code == HTTPStatus.OK
+        title = Title.objects.get()
+        response = admin_client.patch(
+            f'{self.URL_TITLES}{title.id}/?_explain=1',
+            data={'name': 'Новое название'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['name'] == 'Новое название', (
+            'Проверьте, что режим _explain не применяется к запросам, '
+            'изменяющим данные.'
+        )
+        assert records == [False, False], (
+            'Проверьте, что запросы к БД записываются только в режиме '
+            '_explain администратора.'
+        )